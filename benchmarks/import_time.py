@@ -0,0 +1,106 @@
+"""
+Cold-start import time of the ETL entry point, per CLI command.
+
+    python -m benchmarks.import_time --budget-ms 200
+
+Each measurement runs a fresh interpreter that imports what the command
+imports, and subtracts the time of an empty interpreter. Exits with
+status 1 if any command is over the budget, so it can gate CI. With
+--top N the slowest modules of each command (from -X importtime) are
+listed too.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules each command imports on its way to the first request or file read
+COMMAND_IMPORTS = {
+    "help": ("etl.cli",),
+    "run": ("etl.cli", "etl.config", "etl.checkpoint", "etl.extract", "etl.transform", "etl.load",
+            "etl.animal_etl_manager"),
+    "extract": ("etl.cli", "etl.config", "etl.checkpoint", "etl.extract", "etl.staging",
+                "etl.animal_etl_manager"),
+    "transform": ("etl.cli", "etl.config", "etl.staging", "etl.transform", "etl.animal_etl_manager"),
+    "load": ("etl.cli", "etl.config", "etl.checkpoint", "etl.staging", "etl.load", "etl.animal_etl_manager"),
+}
+
+
+def _time_interpreter(code, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def measure(command, repeat=5, baseline=None):
+    """
+    Median milliseconds spent importing the modules of a command.
+    """
+    if baseline is None:
+        baseline = _time_interpreter("pass", repeat)
+    code = "import " + ", ".join(COMMAND_IMPORTS[command])
+    return max(0.0, (_time_interpreter(code, repeat) - baseline) * 1000)
+
+
+def _top_level_imports(code):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # top-level imports are the ones without nesting indentation
+        if name.startswith(" ") and not name.startswith("  "):
+            rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def slowest_imports(command, top=10):
+    """
+    (cumulative microseconds, module) of the slowest top-level imports,
+    leaving out those every interpreter makes at startup.
+    """
+    startup = {name for _, name in _top_level_imports("pass")}
+    rows = [row for row in _top_level_imports("import " + ", ".join(COMMAND_IMPORTS[command]))
+            if row[1] not in startup]
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ETL cold-start import time per command.")
+    parser.add_argument("--commands", default=",".join(COMMAND_IMPORTS),
+                        help="comma-separated subset of " + ",".join(COMMAND_IMPORTS))
+    parser.add_argument("--budget-ms", type=float, default=200.0, help="maximum import time per command")
+    parser.add_argument("--repeat", type=int, default=5, help="interpreter starts per measurement")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports")
+    args = parser.parse_args()
+
+    commands = [c.strip() for c in args.commands.split(",") if c.strip()]
+    unknown = set(commands) - set(COMMAND_IMPORTS)
+    if unknown:
+        parser.error(f"unknown commands: {', '.join(sorted(unknown))}")
+
+    baseline = _time_interpreter("pass", args.repeat)
+    over_budget = []
+    print(f"{'command':<10} {'import ms':>10}   (budget {args.budget_ms:.0f} ms)")
+    for command in commands:
+        elapsed = measure(command, args.repeat, baseline)
+        flag = "" if elapsed <= args.budget_ms else "  OVER BUDGET"
+        print(f"{command:<10} {elapsed:>10.1f}{flag}")
+        if flag:
+            over_budget.append(command)
+        for cumulative, name in slowest_imports(command, args.top) if args.top else ():
+            print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
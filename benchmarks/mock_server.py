@@ -0,0 +1,136 @@
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+API_PREFIX = "/animals/v1"
+_DETAIL_PATH = re.compile(rf"^{API_PREFIX}/animals/(\d+)$")
+
+
+class MockAnimalsAPI:
+    """
+    Local stand-in for the animals API, served on a background thread.
+
+    GET  /animals/v1/animals?page=N   paginated list of {"id", "name"}
+    GET  /animals/v1/animals?ids=1,2  details of several animals
+    GET  /animals/v1/animals/{id}     animal detail
+    POST /animals/v1/home             accepts a JSON (optionally gzip) batch
+
+    Every request sleeps `latency` seconds and fails with a 503 with
+    probability `error_rate`.
+    """
+
+    def __init__(self, animals=1000, page_size=100, latency=0.0, error_rate=0.0, port=0, seed=0):
+        self.animals = animals
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.received = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def animal(self, animal_id):
+        friends = ",".join(f"Friend{(animal_id + k) % 50}" for k in range(1, 4))
+        return {
+            "id": animal_id,
+            "name": f"Animal{animal_id}",
+            "friends": friends,
+            "born_at": f"20{animal_id % 24:02d}-0{animal_id % 9 + 1}-1{animal_id % 9}T12:{animal_id % 60:02d}:00Z",
+        }
+
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _prelude(self):
+                if api.latency:
+                    time.sleep(api.latency)
+                if api._should_fail():
+                    self._send_json(503, {"error": "injected failure"})
+                    return False
+                return True
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                if not self._prelude():
+                    return
+                if path == f"{API_PREFIX}/animals":
+                    params = dict(p.split("=", 1) for p in unquote(query).split("&") if "=" in p)
+                    if "ids" in params:
+                        ids = [int(i) for i in params["ids"].split(",") if i]
+                        self._send_json(200, [api.animal(i) for i in ids if 1 <= i <= api.animals])
+                        return
+                    page = int(params.get("page", 1))
+                    total_pages = max(1, -(-api.animals // api.page_size))
+                    first = (page - 1) * api.page_size + 1
+                    last = min(api.animals, page * api.page_size)
+                    items = [{"id": i, "name": f"Animal{i}"} for i in range(first, last + 1)]
+                    self._send_json(200, {"page": page, "total_pages": total_pages, "items": items})
+                    return
+                match = _DETAIL_PATH.match(path)
+                if match and 1 <= int(match.group(1)) <= api.animals:
+                    self._send_json(200, api.animal(int(match.group(1))))
+                    return
+                self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not self._prelude():
+                    return
+                if self.path != f"{API_PREFIX}/home":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                batch = json.loads(body)
+                with api._lock:
+                    api.received += len(batch)
+                self._send_json(200, {"message": f"Received {len(batch)} animals"})
+
+        return Handler
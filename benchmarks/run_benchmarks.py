@@ -0,0 +1,251 @@
+"""
+Throughput benchmarks for the ETL stages against a local mock API.
+
+    python -m benchmarks.run_benchmarks --animals 5000 --latency 0.005
+
+Reports records/sec, p50/p99 latency and peak traced memory for the
+extractor, transformer, loader and a full AnimalETLManager run. Latency
+is per HTTP request for network stages and per page-sized chunk for the
+transformer.
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from etl.animal_etl_manager import AnimalETLManager
+from etl.config import Config
+from etl.extract import AnimalExtractor
+from etl.load import AnimalLoader
+from etl.pipeline import PipelineExecutor
+from etl.transform import AnimalTransformer
+from etl.utils import CircuitBreaker, HttpSession, Logger, RateLimiter, RetryBudget
+
+from .mock_server import MockAnimalsAPI
+
+STAGES = ("extract", "transform", "load", "full")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_config(base_config, server, overrides=None, profile=None):
+    """
+    Write a temporary config pointing at the mock server and load it.
+    """
+    with open(base_config, "r") as f:
+        settings = yaml.safe_load(f) or {}
+    settings.update({
+        "animals_url": f"{server.base_url}/animals",
+        "home_url": f"{server.base_url}/home",
+        "cache_enabled": False,
+        "incremental": False,
+    })
+    settings.update(overrides or {})
+    fd, path = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(fd, "w") as f:
+        yaml.safe_dump(settings, f)
+    try:
+        return Config(path, profile=profile)
+    finally:
+        os.remove(path)
+
+
+class StageResult:
+
+    def __init__(self, stage, records, seconds, latencies, peak_bytes):
+        self.stage = stage
+        self.records = records
+        self.seconds = seconds
+        self.latencies = latencies
+        self.peak_bytes = peak_bytes
+
+    def as_dict(self):
+        return {
+            "stage": self.stage,
+            "records": self.records,
+            "seconds": round(self.seconds, 4),
+            "records_per_sec": round(self.records / self.seconds, 1) if self.seconds else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 3),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 3),
+            "peak_mb": round(self.peak_bytes / (1024 * 1024), 2),
+        }
+
+
+class BenchmarkRunner:
+
+    def __init__(self, cfg, server, trace_memory=True):
+        self.cfg = cfg
+        self.server = server
+        self.trace_memory = trace_memory
+        self.latencies = []
+        session = HttpSession.get_session(cfg)
+        session.hooks["response"].append(self._record_latency)
+
+    def _record_latency(self, resp, *args, **kwargs):
+        self.latencies.append(resp.elapsed.total_seconds())
+
+    def measure(self, stage, func):
+        self.latencies = []
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            records, latencies = func()
+        seconds = time.perf_counter() - start
+        peak = 0
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return StageResult(stage, records, seconds, latencies if latencies is not None else self.latencies, peak)
+
+    def run(self, stages=STAGES):
+        results = []
+        animals = None
+        transformed = None
+
+        if {"extract", "transform", "load"} & set(stages):
+            extractor = AnimalExtractor(self.cfg)
+            holder = {}
+
+            def extract():
+                holder["animals"] = extractor.get_all_animals()
+                return len(holder["animals"]), None
+
+            result = self.measure("extract", extract)
+            animals = holder["animals"]
+            if "extract" in stages:
+                results.append(result)
+
+        if {"transform", "load"} & set(stages):
+            transformer = AnimalTransformer(self.cfg.get_transform_processes(), self.cfg.get_transform_chunk_size())
+            chunk = self.server.page_size
+            source = copy.deepcopy(animals)
+            holder = {}
+
+            def transform():
+                chunk_times = []
+                output = []
+                for i in range(0, len(source), chunk):
+                    start = time.perf_counter()
+                    output.extend(transformer.transform_batch(source[i:i + chunk]))
+                    chunk_times.append(time.perf_counter() - start)
+                holder["transformed"] = output
+                return len(output), chunk_times
+
+            try:
+                result = self.measure("transform", transform)
+            finally:
+                transformer.close()
+            transformed = holder["transformed"]
+            if "transform" in stages:
+                results.append(result)
+
+        if "load" in stages:
+            loader = AnimalLoader(self.cfg)
+
+            def load():
+                loader.post_all_animals(transformed)
+                return len(transformed), None
+
+            results.append(self.measure("load", load))
+
+        if "full" in stages:
+            def full():
+                received_before = self.server.received
+                pipeline = PipelineExecutor(self.cfg) if self.cfg.get_pipelined() else None
+                AnimalETLManager(
+                    AnimalExtractor(self.cfg),
+                    AnimalTransformer(self.cfg.get_transform_processes(), self.cfg.get_transform_chunk_size()),
+                    AnimalLoader(self.cfg),
+                    streaming=self.cfg.get_streaming(),
+                    pipeline=pipeline,
+                ).run()
+                return self.server.received - received_before, None
+
+            results.append(self.measure("full", full))
+
+        return results
+
+
+def format_table(results):
+    header = f"{'stage':<10} {'records':>8} {'seconds':>9} {'records/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        row = result.as_dict()
+        lines.append(
+            f"{row['stage']:<10} {row['records']:>8} {row['seconds']:>9.3f} {row['records_per_sec']:>10.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['peak_mb']:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def run(animals=1000, page_size=100, latency=0.0, error_rate=0.0, stages=STAGES,
+        base_config="config.yaml", overrides=None, trace_memory=True, profile=None):
+    """
+    Start a mock API, run the requested stages against it and return
+    their StageResults.
+    """
+    logger = Logger.get_logger()
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    with MockAnimalsAPI(animals, page_size, latency, error_rate) as server:
+        cfg = make_config(base_config, server, overrides, profile)
+        try:
+            return BenchmarkRunner(cfg, server, trace_memory).run(stages)
+        finally:
+            # process-wide state is keyed by the mock server's URLs
+            HttpSession.close()
+            RateLimiter.reset()
+            RetryBudget.reset()
+            CircuitBreaker.reset()
+            logger.setLevel(level)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL against a local mock animals API.")
+    parser.add_argument("--animals", type=int, default=1000, help="dataset size")
+    parser.add_argument("--page-size", type=int, default=100, help="animals per list page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected 503")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of " + ",".join(STAGES))
+    parser.add_argument("--config", default="config.yaml", help="base config; URLs are replaced")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config value (YAML syntax), e.g. --set max_concurrency=16")
+    parser.add_argument("--profile", help="performance profile applied over the base config")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows the run)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        overrides[key] = yaml.safe_load(value)
+    stages = tuple(s.strip() for s in args.stages.split(",") if s.strip())
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = run(args.animals, args.page_size, args.latency, args.error_rate, stages,
+                  args.config, overrides, not args.no_memory, args.profile)
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([r.as_dict() for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
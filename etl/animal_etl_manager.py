@@ -1,19 +1,62 @@
+from .metrics import Metrics
+
 class AnimalETLManager:
 
-    def __init__(self, extractor, transformer, loader):
+    def __init__(self, extractor, transformer, loader, streaming=False, pipeline=None):
         self.extractor = extractor
         self.transformer = transformer
         self.loader = loader
+        self.streaming = streaming
+        self.pipeline = pipeline
+        self.metrics = Metrics.get_metrics()
 
     def run(self):
+        """
+        Run the ETL in the configured mode, then release the transformer's
+        workers and flush metrics to their sinks.
+        """
+        if self.pipeline is not None:
+            mode, run = "pipelined", self._run_pipelined
+        elif self.streaming:
+            mode, run = "streaming", self._run_streaming
+        else:
+            mode, run = "batch", self._run_batch
+
+        try:
+            with self.metrics.timer("run_seconds", {"mode": mode}):
+                run()
+        finally:
+            self.transformer.close()
+            self.metrics.flush()
+
+    def _run_batch(self):
         print("Fetching all animals...")
-        animals = self.extractor.get_all_animals()
+        with self.metrics.timer("stage_seconds", {"stage": "extract"}):
+            animals = self.extractor.get_all_animals()
         print(f"Fetched {len(animals)} animals")
 
         print("Transforming animals...")
-        transformed = [self.transformer.transform(a) for a in animals]
+        with self.metrics.timer("stage_seconds", {"stage": "transform"}):
+            transformed = self.transformer.transform_batch(animals)
 
         print("Posting animals in batches...")
+        with self.metrics.timer("stage_seconds", {"stage": "load"}):
+            self.loader.post_all_animals(transformed)
+
+        print("ETL completed successfully!")
+
+    def _run_streaming(self):
+        # each record flows through all three stages as soon as it is fetched,
+        # so memory stays at one batch and the first POST goes out early
+        print("Streaming animals: fetch -> transform -> post in batches...")
+        animals = self.extractor.iter_animals()
+        transformed = self.transformer.transform_all(animals)
         self.loader.post_all_animals(transformed)
 
         print("ETL completed successfully!")
+
+    def _run_pipelined(self):
+        print("Running pipelined ETL: fetch, transform and post run concurrently...")
+        self.pipeline.run(self.extractor, self.transformer, self.loader)
+
+        print("ETL completed successfully!")
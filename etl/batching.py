@@ -0,0 +1,74 @@
+import json
+import threading
+
+from .config import Config
+from .records import to_json_or_str
+
+# every _SAMPLE_EVERY-th record is encoded to track the average record size,
+# which moves a _SAMPLE_WEIGHT fraction towards each new sample
+_SAMPLE_EVERY = 16
+_SAMPLE_WEIGHT = 0.2
+
+
+class AdaptiveBatcher:
+    """
+    Splits records into batches capped by both record count and serialized
+    size, and tunes the count from observed POST results (AIMD): every
+    fast, successful batch grows the size by a fixed step, while a failure
+    or a batch slower than the target latency halves it.
+
+    Serialized size is estimated from a sample of the records (the first
+    and every _SAMPLE_EVERY-th one) instead of encoding every record, so
+    the byte cap is approximate; a batch the server still rejects with 413
+    is split by the loader.
+    """
+
+    def __init__(self, cfg: Config):
+        self.batch_size = cfg.get_batch_size()
+        self.min_size = cfg.get_min_batch_size()
+        self.max_size = cfg.get_max_batch_size()
+        self.max_bytes = cfg.get_max_batch_bytes()
+        self.target_latency = cfg.get_target_batch_latency()
+        self.step = max(1, self.min_size)
+        self._record_bytes = None
+        self._lock = threading.Lock()
+
+    def iter_batches(self, animals):
+        batch = []
+        for count, animal in enumerate(animals):
+            if count % _SAMPLE_EVERY == 0:
+                self._sample(animal)
+            # 2 for the enclosing brackets
+            if batch and (len(batch) >= self.batch_size
+                          or 2 + (len(batch) + 1) * self._record_bytes > self.max_bytes):
+                yield batch
+                batch = []
+            batch.append(animal)
+        if batch:
+            yield batch
+
+    def _sample(self, animal):
+        # +2 for the ", " separator json.dumps puts between records
+        size = len(json.dumps(animal, default=to_json_or_str).encode("utf-8")) + 2
+        if self._record_bytes is None:
+            self._record_bytes = size
+        else:
+            self._record_bytes += (size - self._record_bytes) * _SAMPLE_WEIGHT
+
+    def record(self, elapsed, success):
+        """
+        Feed back the outcome of one POST and adjust the batch size.
+        """
+        with self._lock:
+            if success and elapsed <= self.target_latency:
+                self.batch_size = min(self.max_size, self.batch_size + self.step)
+            else:
+                self.batch_size = max(self.min_size, self.batch_size // 2)
+
+    def record_too_large(self, size):
+        """
+        A batch of size records was rejected with 413: keep later batches
+        below half of it.
+        """
+        with self._lock:
+            self.batch_size = max(self.min_size, min(self.batch_size, size // 2))
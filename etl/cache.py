@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# A cached response body with its validators; fresh is False once the TTL
+# has passed and the entry must be revalidated before use
+CacheEntry = namedtuple("CacheEntry", ["body", "etag", "last_modified", "fresh"])
+
+# cache hits are written back to last_access in batches of this many
+_ACCESS_FLUSH_EVERY = 256
+# least recently used entries are deleted this many at a time
+_EVICT_BATCH = 32
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache keyed by URL, kept in a SQLite file.
+
+    Entries younger than ttl_seconds are served without a request. Older
+    entries are revalidated with If-None-Match / If-Modified-Since when
+    the server sent an ETag or Last-Modified. The total body size is
+    capped at max_bytes by evicting the least recently used entries.
+
+    Hits update last_access in memory; the times are written back in one
+    statement every _ACCESS_FLUSH_EVERY hits and before any write, so a
+    hit costs no SQLite write of its own.
+    """
+
+    def __init__(self, path, ttl_seconds=3600, max_bytes=100 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._accessed = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, "
+            "stored_at REAL, last_access REAL, size INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url):
+        """
+        Return the CacheEntry for url, or None if it is not cached.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[url] = now
+            if len(self._accessed) >= _ACCESS_FLUSH_EVERY:
+                self._flush_accessed()
+                self._conn.commit()
+        body, etag, last_modified, stored_at = row
+        return CacheEntry(body, etag, last_modified, now - stored_at < self.ttl_seconds)
+
+    def put(self, url, body, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                self._total_bytes -= row[0]
+            self._flush_accessed()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, stored_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._total_bytes += len(body)
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url):
+        """
+        Mark an entry as fresh again after a 304 Not Modified.
+        """
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(url, None)
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._accessed.clear()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+    @staticmethod
+    def validators(entry):
+        """
+        Conditional request headers for revalidating a stale entry.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _flush_accessed(self):
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE url = ?",
+                [(accessed, url) for url, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM responses ORDER BY last_access LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            evicted = []
+            for url, size in rows:
+                evicted.append((url,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+            self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from .records import to_json, to_json_or_str
+
+
+class CheckpointStore:
+    """
+    Durable record of finished work, kept in a local SQLite file so an
+    interrupted run can be resumed.
+
+    Completed pages are stored together with their fetched records, so a
+    resumed extraction replays them without touching the API. Posted
+    batches are stored by a hash of their content, so a batch is only
+    skipped if exactly the same records were acknowledged before.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (page INTEGER PRIMARY KEY, total_pages INTEGER, records TEXT)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS batches (batch_key TEXT PRIMARY KEY)")
+        self._conn.commit()
+
+    def load_page(self, page):
+        """
+        Return (total_pages, records) for a completed page, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total_pages, records FROM pages WHERE page = ?", (page,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def has_page(self, page):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM pages WHERE page = ?", (page,)).fetchone()
+        return row is not None
+
+    def save_page(self, page, total_pages, records):
+        self.save_page_snapshots(page, total_pages, [self.snapshot(r) for r in records])
+
+    def save_page_snapshots(self, page, total_pages, snapshots):
+        """
+        Save a completed page from records already encoded by snapshot().
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (page, total_pages, records) VALUES (?, ?, ?)",
+                (page, total_pages, "[" + ",".join(snapshots) + "]"),
+            )
+            self._conn.commit()
+
+    def is_batch_done(self, batch):
+        key = self.batch_key(batch)
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM batches WHERE batch_key = ?", (key,)).fetchone()
+        return row is not None
+
+    def mark_batch_done(self, batch):
+        key = self.batch_key(batch)
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO batches (batch_key) VALUES (?)", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM batches")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def snapshot(record):
+        """
+        Encode a record for save_page_snapshots(). Taken before the record
+        is handed downstream, which may transform it in place.
+        """
+        return json.dumps(record, default=to_json)
+
+    @staticmethod
+    def batch_key(batch):
+        payload = json.dumps(batch, sort_keys=True, default=to_json_or_str).encode("utf-8")
+        return hashlib.sha1(payload).hexdigest()
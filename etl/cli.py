@@ -0,0 +1,151 @@
+"""
+Command-line entry point:
+
+    python main.py [run|extract|transform|load] [options]
+
+run (the default) does the whole ETL. extract writes untransformed
+animals to raw_staging_dir, transform turns them into transformed
+animals in staging_dir, and load posts those to home_url. Stage modules
+are imported by the command that needs them, so startup only pays for
+what a command uses.
+"""
+import argparse
+
+COMMANDS = ("run", "extract", "transform", "load")
+# the keys of etl.config.PROFILES, repeated so --help does not import yaml
+PROFILE_NAMES = ("throughput", "low-memory", "gentle-upstream")
+
+
+def parse_shard(value):
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in [0, {count}), got {index}")
+    return index, count
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the animal ETL.")
+    parser.add_argument("command", nargs="?", default="run", choices=COMMANDS,
+                        help="stage to run (default: run, the whole ETL)")
+    parser.add_argument("--config", default="config.yaml", help="path to the config file")
+    parser.add_argument("--profile", choices=PROFILE_NAMES, help="performance profile applied over the config file")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config value (YAML syntax), e.g. --set max_concurrency=16")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip pages and batches completed by an interrupted run")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="in incremental mode, forget posted hashes and post every animal")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="extract only pages where (page - 1) %% N == i, e.g. 0/4")
+    staging = parser.add_mutually_exclusive_group()
+    staging.add_argument("--to-staging", action="store_true",
+                         help="run: write transformed animals to staging_dir instead of posting them")
+    staging.add_argument("--from-staging", action="store_true",
+                         help="run: post animals staged by --to-staging without calling the source API")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from .config import Config, ConfigError, parse_overrides
+    from .metrics import Metrics
+    from .utils import Logger
+
+    try:
+        cfg = Config(args.config, profile=args.profile, overrides=parse_overrides(args.set))
+    except ConfigError as e:
+        parser.error(str(e))
+    Logger.configure(cfg)
+    _add_metrics_sinks(cfg, Metrics.get_metrics())
+
+    from_api = args.command == "extract" or (args.command == "run" and not args.from_staging)
+    to_api = args.command == "load" or (args.command == "run" and not args.to_staging)
+    shard = args.shard or (cfg.get_shard_index(), cfg.get_shard_count())
+
+    checkpoint = None
+    if from_api or to_api:
+        from .checkpoint import CheckpointStore
+        checkpoint_file = cfg.get_checkpoint_file()
+        if shard[1] > 1:
+            # shards run side by side and must not clear each other's progress
+            checkpoint_file = f"{checkpoint_file}.shard{shard[0]}of{shard[1]}"
+        checkpoint = CheckpointStore(checkpoint_file)
+        if not args.resume:
+            checkpoint.clear()
+
+    hash_index = None
+    if to_api and cfg.get_incremental():
+        from .incremental import HashIndex
+        hash_index = HashIndex(cfg.get_hash_index_file())
+        if args.full_refresh:
+            hash_index.clear()
+
+    cache = None
+    if from_api and cfg.get_cache_enabled():
+        from .cache import ResponseCache
+        cache = ResponseCache(cfg.get_cache_file(), cfg.get_cache_ttl(), cfg.get_cache_max_bytes())
+
+    extractor = _build_extractor(args, cfg, checkpoint, cache, shard)
+    transformer = _build_transformer(args, cfg)
+    loader = _build_loader(args, cfg, checkpoint, hash_index)
+
+    from .animal_etl_manager import AnimalETLManager
+    pipeline = None
+    if cfg.get_pipelined():
+        from .pipeline import PipelineExecutor
+        pipeline = PipelineExecutor(cfg)
+    AnimalETLManager(extractor, transformer, loader, streaming=cfg.get_streaming(), pipeline=pipeline).run()
+
+    if checkpoint is not None:
+        # the run finished, so the next one starts from scratch
+        checkpoint.clear()
+        checkpoint.close()
+    if hash_index is not None:
+        hash_index.close()
+    if cache is not None:
+        cache.close()
+
+
+def _add_metrics_sinks(cfg, metrics):
+    if cfg.get_metrics_json_file():
+        from .metrics import JsonSummarySink
+        metrics.add_sink(JsonSummarySink(cfg.get_metrics_json_file()))
+    if cfg.get_metrics_prometheus_file():
+        from .metrics import PrometheusTextFileSink
+        metrics.add_sink(PrometheusTextFileSink(cfg.get_metrics_prometheus_file()))
+
+
+def _build_extractor(args, cfg, checkpoint, cache, shard):
+    if args.command == "transform":
+        from .staging import FileExtractor
+        return FileExtractor(cfg, cfg.get_raw_staging_dir())
+    if args.command == "load" or args.from_staging:
+        from .staging import FileExtractor
+        return FileExtractor(cfg)
+    from .extract import AnimalExtractor
+    return AnimalExtractor(cfg, checkpoint=checkpoint, cache=cache, shard=shard)
+
+
+def _build_transformer(args, cfg):
+    if args.command in ("extract", "load") or args.from_staging:
+        from .staging import PassthroughTransformer
+        return PassthroughTransformer()
+    from .transform import AnimalTransformer
+    return AnimalTransformer(cfg.get_transform_processes(), cfg.get_transform_chunk_size())
+
+
+def _build_loader(args, cfg, checkpoint, hash_index):
+    if args.command == "extract":
+        from .staging import FileLoader
+        return FileLoader(cfg, cfg.get_raw_staging_dir())
+    if args.command == "transform" or args.to_staging:
+        from .staging import FileLoader
+        return FileLoader(cfg)
+    from .load import AnimalLoader
+    return AnimalLoader(cfg, checkpoint=checkpoint, hash_index=hash_index)
@@ -1,27 +1,434 @@
 import yaml
 import os
+from collections import namedtuple
+
+# One config key: its type, default and allowed values. minimum is
+# inclusive and above exclusive; choices, when set, lists every accepted value.
+Setting = namedtuple("Setting", ["type", "default", "minimum", "choices", "above"], defaults=(None, None, None))
+
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+SCHEMA = {
+    "animals_url": Setting(str, None),
+    "home_url": Setting(str, None),
+    # retries and resilience
+    "max_attempts": Setting(int, 5, 1),
+    "backoff_factor": Setting(float, 2, 0),
+    "timeout_seconds": Setting(float, 30, above=0),
+    "max_backoff_seconds": Setting(float, 30, 0),
+    "retry_jitter": Setting(bool, True),
+    "retry_budget_ratio": Setting(float, 0.2, 0),
+    "retry_budget_min": Setting(int, 10, 0),
+    "circuit_failure_threshold": Setting(int, 5, 1),
+    "circuit_reset_seconds": Setting(float, 30, 0),
+    "animals_rate_limit": Setting(float, 0, 0),
+    "home_rate_limit": Setting(float, 0, 0),
+    "rate_limit_burst": Setting(int, 10, 1),
+    # extract
+    "max_concurrency": Setting(int, 1, 1),
+    "page_prefetch": Setting(int, 1, 0),
+    "pool_maxsize": Setting(int, 10, 1),
+    "http2": Setting(bool, False),
+    "detail_required_fields": Setting(list, []),
+    "bulk_detail_param": Setting(str, ""),
+    "bulk_detail_size": Setting(int, 50, 1),
+    "shard_index": Setting(int, 0, 0),
+    "shard_count": Setting(int, 1, 1),
+    "compact_records": Setting(bool, False),
+    # transform
+    "transform_processes": Setting(int, 1, 1),
+    "transform_chunk_size": Setting(int, 1000, 1),
+    # load
+    "batch_size": Setting(int, 100, 1),
+    "max_in_flight_batches": Setting(int, 1, 1),
+    "ordered_completion": Setting(bool, True),
+    "adaptive_batching": Setting(bool, False),
+    "min_batch_size": Setting(int, 10, 1),
+    "max_batch_size": Setting(int, 1000, 1),
+    "max_batch_bytes": Setting(int, 1024 * 1024, 1),
+    "target_batch_latency_seconds": Setting(float, 2.0, 0),
+    # run modes
+    "streaming": Setting(bool, False),
+    "pipelined": Setting(bool, False),
+    "queue_size": Setting(int, 1000, 1),
+    "transform_workers": Setting(int, 1, 1),
+    "load_workers": Setting(int, 1, 1),
+    # local state
+    "checkpoint_file": Setting(str, "state/checkpoint.db"),
+    "incremental": Setting(bool, False),
+    "hash_index_file": Setting(str, "state/hash_index.db"),
+    "cache_enabled": Setting(bool, False),
+    "cache_file": Setting(str, "state/http_cache.db"),
+    "cache_ttl_seconds": Setting(float, 3600, 0),
+    "cache_max_bytes": Setting(int, 100 * 1024 * 1024, 0),
+    "staging_dir": Setting(str, "state/staging"),
+    "raw_staging_dir": Setting(str, "state/raw"),
+    "staging_format": Setting(str, "ndjson", choices=("ndjson", "parquet")),
+    "staging_compression": Setting(str, "gzip", choices=("none", "gzip", "zstd")),
+    "staging_chunk_records": Setting(int, 10000, 1),
+    # serialisation
+    "json_backend": Setting(str, "auto", choices=("auto", "orjson", "msgspec", "json")),
+    "request_compression": Setting(str, "none", choices=("none", "gzip", "zstd")),
+    "compression_min_bytes": Setting(int, 1024, 0),
+    # observability
+    "metrics_json_file": Setting(str, ""),
+    "metrics_prometheus_file": Setting(str, ""),
+    "log_level": Setting(str, "INFO", choices=_LOG_LEVELS),
+    "console_log_level": Setting(str, "INFO", choices=_LOG_LEVELS),
+    "log_progress_every": Setting(int, 1000, 1),
+}
+
+# Named sets of performance settings. A profile overrides config.yaml and
+# is itself overridden by environment variables and CLI --set values.
+PROFILES = {
+    # saturate a fast, generous upstream and target endpoint
+    "throughput": {
+        "max_concurrency": 32,
+        "pool_maxsize": 64,
+        "page_prefetch": 8,
+        "streaming": True,
+        "pipelined": False,
+        "batch_size": 500,
+        "max_in_flight_batches": 8,
+        "ordered_completion": False,
+        "adaptive_batching": True,
+        "max_batch_size": 5000,
+        "max_batch_bytes": 8 * 1024 * 1024,
+        "json_backend": "auto",
+        "animals_rate_limit": 0,
+        "home_rate_limit": 0,
+        "max_attempts": 5,
+        "max_backoff_seconds": 10,
+        "compact_records": False,
+    },
+    # keep roughly one batch of records in memory at a time
+    "low-memory": {
+        "max_concurrency": 4,
+        "pool_maxsize": 4,
+        "page_prefetch": 1,
+        "streaming": True,
+        "pipelined": False,
+        "queue_size": 100,
+        "batch_size": 100,
+        "max_in_flight_batches": 1,
+        "adaptive_batching": False,
+        "max_batch_bytes": 256 * 1024,
+        "transform_processes": 1,
+        "compact_records": True,
+        "cache_max_bytes": 16 * 1024 * 1024,
+        "staging_chunk_records": 1000,
+    },
+    # low request rate and quick back-off for a fragile or shared upstream
+    "gentle-upstream": {
+        "max_concurrency": 2,
+        "pool_maxsize": 2,
+        "page_prefetch": 1,
+        "max_in_flight_batches": 1,
+        "animals_rate_limit": 5,
+        "home_rate_limit": 2,
+        "rate_limit_burst": 2,
+        "max_attempts": 5,
+        "backoff_factor": 2,
+        "max_backoff_seconds": 60,
+        "retry_jitter": True,
+        "retry_budget_ratio": 0.1,
+        "circuit_failure_threshold": 3,
+        "circuit_reset_seconds": 60,
+        "cache_enabled": True,
+        "adaptive_batching": True,
+        "target_batch_latency_seconds": 1.0,
+    },
+}
+
+ENV_PREFIX = "ETL_"
+
+
+class ConfigError(ValueError):
+    pass
+
 
 class Config:
-    def __init__(self, config_file="config.yaml"):
+    """
+    Validated ETL settings.
+
+    Values are resolved once, in increasing precedence: schema defaults,
+    the YAML file, the named profile, ETL_<KEY> environment variables, and
+    explicit overrides (e.g. `--set KEY=VALUE` on the command line). The
+    profile comes from the `profile` argument, ETL_PROFILE, or `profile:` in
+    the file. Environment and override values are parsed as YAML scalars,
+    so "16", "true" and "[a, b]" work. Every value is type- and
+    range-checked; all problems are reported together in one ConfigError.
+    """
+
+    def __init__(self, config_file="config.yaml", profile=None, overrides=None, environ=None):
         if not os.path.exists(config_file):
             raise FileNotFoundError(f"Config file not found: {config_file}")
         with open(config_file, "r") as f:
-            self.config = yaml.safe_load(f)
+            file_values = yaml.safe_load(f) or {}
+        environ = os.environ if environ is None else environ
+
+        env_values = {
+            key[len(ENV_PREFIX):].lower(): yaml.safe_load(value)
+            for key, value in environ.items()
+            if key.startswith(ENV_PREFIX) and key[len(ENV_PREFIX):].lower() in SCHEMA
+        }
+        overrides = dict(overrides or {})
+        self.profile = (profile or overrides.pop("profile", None) or environ.get(f"{ENV_PREFIX}PROFILE")
+                        or file_values.pop("profile", None))
+        file_values.pop("profile", None)
+        if self.profile is not None and self.profile not in PROFILES:
+            raise ConfigError(f"Unknown profile {self.profile!r}; choose from {', '.join(PROFILES)}")
+
+        errors = []
+        for source, values in (("config file", file_values), ("overrides", overrides)):
+            for key in values:
+                if key not in SCHEMA:
+                    errors.append(f"unknown setting {key!r} in {source}")
+
+        resolved = {key: setting.default for key, setting in SCHEMA.items()}
+        for layer in (file_values, PROFILES.get(self.profile, {}), env_values, overrides):
+            resolved.update((k, v) for k, v in layer.items() if k in SCHEMA)
+
+        self.config = {}
+        for key, setting in SCHEMA.items():
+            value, error = _check(key, setting, resolved[key])
+            if error:
+                errors.append(error)
+            self.config[key] = value
+        errors.extend(self._cross_checks())
+        if errors:
+            raise ConfigError("Invalid configuration:\n  " + "\n  ".join(errors))
+
+    def _cross_checks(self):
+        c = self.config
+        errors = []
+        for key in ("animals_url", "home_url"):
+            if not c[key]:
+                errors.append(f"{key} is required")
+        if c["min_batch_size"] > c["max_batch_size"]:
+            errors.append("min_batch_size must not exceed max_batch_size")
+        if c["shard_index"] >= c["shard_count"]:
+            errors.append("shard_index must be less than shard_count")
+        return errors
+
+    def as_dict(self):
+        return dict(self.config)
 
     def get_animals_url(self):
-        return self.config.get("animals_url")
+        return self.config["animals_url"]
 
     def get_home_url(self):
-        return self.config.get("home_url")
+        return self.config["home_url"]
 
     def get_batch_size(self):
-        return self.config.get("batch_size", 100)
+        return self.config["batch_size"]
 
     def get_max_attempts(self):
-        return self.config.get("max_attempts", 5)
+        return self.config["max_attempts"]
 
     def get_backoff_factor(self):
-        return self.config.get("backoff_factor", 2)
+        return self.config["backoff_factor"]
 
     def get_timeout(self):
-        return self.config.get("timeout_seconds", 30)
+        return self.config["timeout_seconds"]
+
+    def get_max_concurrency(self):
+        return self.config["max_concurrency"]
+
+    def get_pool_maxsize(self):
+        return self.config["pool_maxsize"]
+
+    def get_http2(self):
+        return self.config["http2"]
+
+    def get_streaming(self):
+        return self.config["streaming"]
+
+    def get_pipelined(self):
+        return self.config["pipelined"]
+
+    def get_queue_size(self):
+        return self.config["queue_size"]
+
+    def get_transform_workers(self):
+        return self.config["transform_workers"]
+
+    def get_load_workers(self):
+        return self.config["load_workers"]
+
+    def get_max_in_flight_batches(self):
+        return self.config["max_in_flight_batches"]
+
+    def get_ordered_completion(self):
+        return self.config["ordered_completion"]
+
+    def get_checkpoint_file(self):
+        return self.config["checkpoint_file"]
+
+    def get_incremental(self):
+        return self.config["incremental"]
+
+    def get_hash_index_file(self):
+        return self.config["hash_index_file"]
+
+    def get_cache_enabled(self):
+        return self.config["cache_enabled"]
+
+    def get_cache_file(self):
+        return self.config["cache_file"]
+
+    def get_cache_ttl(self):
+        return self.config["cache_ttl_seconds"]
+
+    def get_cache_max_bytes(self):
+        return self.config["cache_max_bytes"]
+
+    def get_transform_processes(self):
+        return self.config["transform_processes"]
+
+    def get_transform_chunk_size(self):
+        return self.config["transform_chunk_size"]
+
+    def get_adaptive_batching(self):
+        return self.config["adaptive_batching"]
+
+    def get_min_batch_size(self):
+        return self.config["min_batch_size"]
+
+    def get_max_batch_size(self):
+        return self.config["max_batch_size"]
+
+    def get_max_batch_bytes(self):
+        return self.config["max_batch_bytes"]
+
+    def get_target_batch_latency(self):
+        return self.config["target_batch_latency_seconds"]
+
+    def get_json_backend(self):
+        return self.config["json_backend"]
+
+    def get_request_compression(self):
+        return self.config["request_compression"]
+
+    def get_compression_min_bytes(self):
+        return self.config["compression_min_bytes"]
+
+    def get_animals_rate_limit(self):
+        return self.config["animals_rate_limit"]
+
+    def get_home_rate_limit(self):
+        return self.config["home_rate_limit"]
+
+    def get_rate_limit_burst(self):
+        return self.config["rate_limit_burst"]
+
+    def get_max_backoff(self):
+        return self.config["max_backoff_seconds"]
+
+    def get_retry_jitter(self):
+        return self.config["retry_jitter"]
+
+    def get_retry_budget_ratio(self):
+        return self.config["retry_budget_ratio"]
+
+    def get_retry_budget_min(self):
+        return self.config["retry_budget_min"]
+
+    def get_circuit_failure_threshold(self):
+        return self.config["circuit_failure_threshold"]
+
+    def get_circuit_reset_seconds(self):
+        return self.config["circuit_reset_seconds"]
+
+    def get_metrics_json_file(self):
+        return self.config["metrics_json_file"]
+
+    def get_metrics_prometheus_file(self):
+        return self.config["metrics_prometheus_file"]
+
+    def get_log_level(self):
+        return self.config["log_level"]
+
+    def get_console_log_level(self):
+        return self.config["console_log_level"]
+
+    def get_log_progress_every(self):
+        return self.config["log_progress_every"]
+
+    def get_detail_required_fields(self):
+        return self.config["detail_required_fields"]
+
+    def get_bulk_detail_param(self):
+        return self.config["bulk_detail_param"]
+
+    def get_bulk_detail_size(self):
+        return self.config["bulk_detail_size"]
+
+    def get_page_prefetch(self):
+        return self.config["page_prefetch"]
+
+    def get_shard_index(self):
+        return self.config["shard_index"]
+
+    def get_shard_count(self):
+        return self.config["shard_count"]
+
+    def get_compact_records(self):
+        return self.config["compact_records"]
+
+    def get_staging_dir(self):
+        return self.config["staging_dir"]
+
+    def get_raw_staging_dir(self):
+        return self.config["raw_staging_dir"]
+
+    def get_staging_format(self):
+        return self.config["staging_format"]
+
+    def get_staging_compression(self):
+        return self.config["staging_compression"]
+
+    def get_staging_chunk_records(self):
+        return self.config["staging_chunk_records"]
+
+
+def parse_overrides(items):
+    """
+    Turn KEY=VALUE strings into a dict, parsing each value as YAML.
+    """
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ConfigError(f"Expected KEY=VALUE, got {item!r}")
+        overrides[key.strip()] = yaml.safe_load(value)
+    return overrides
+
+
+def _check(key, setting, value):
+    # returns (value, error); ints are accepted for floats, bools never for numbers
+    if value is None:
+        if setting.default is None:
+            return None, None
+        if setting.default == "":
+            # a blank value (e.g. `ETL_METRICS_JSON_FILE=`) switches the setting off
+            return "", None
+        return value, f"{key} must not be empty"
+    if setting.type is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if setting.type is list:
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            return value, f"{key} must be a list of strings, got {value!r}"
+        return value, None
+    if not isinstance(value, setting.type) or (setting.type is not bool and isinstance(value, bool)):
+        return value, f"{key} must be {setting.type.__name__}, got {value!r}"
+    if setting.choices is not None:
+        if setting.type is str and key.endswith("log_level"):
+            value = value.upper()
+        if value not in setting.choices:
+            return value, f"{key} must be one of {', '.join(setting.choices)}, got {value!r}"
+    if setting.minimum is not None and value < setting.minimum:
+        return value, f"{key} must be >= {setting.minimum}, got {value!r}"
+    if setting.above is not None and value <= setting.above:
+        return value, f"{key} must be > {setting.above}, got {value!r}"
+    return value, None
@@ -1,16 +1,30 @@
-import requests
-import time
-from requests.exceptions import RequestException
+from concurrent.futures import ThreadPoolExecutor
 
-from .utils import RetryHandler, Logger
+from .metrics import Metrics
+from .records import AnimalRecord
+from .serialization import Serializer
+from .utils import RetryHandler, Logger, CircuitOpenError, RetryBudgetExhaustedError
 from .config import Config
 
 class AnimalExtractor:
 
-    def __init__(self, cfg: Config):
+    def __init__(self, cfg: Config, checkpoint=None, cache=None, shard=None):
         self.base_url = cfg.get_animals_url()
         self.timeout = cfg.get_timeout()
+        self.max_concurrency = cfg.get_max_concurrency()
+        self.page_prefetch = cfg.get_page_prefetch()
+        self.shard_index, self.shard_count = shard or (cfg.get_shard_index(), cfg.get_shard_count())
+        if not 0 <= self.shard_index < self.shard_count:
+            raise ValueError(f"Invalid shard {self.shard_index}/{self.shard_count}")
+        self.required_fields = cfg.get_detail_required_fields()
+        self.bulk_detail_param = cfg.get_bulk_detail_param()
+        self.bulk_detail_size = cfg.get_bulk_detail_size()
+        self.compact = cfg.get_compact_records()
+        self.checkpoint = checkpoint
+        self.cache = cache
+        self.serializer = Serializer(cfg)
         self.retry_handler = RetryHandler(cfg)
+        self.metrics = Metrics.get_metrics()
         self.logger = Logger.get_logger()
 
     def get_animal_detail(self, animal_id):
@@ -18,43 +32,219 @@ class AnimalExtractor:
         Fetch details for a single animal by ID, with retries.
         """
         url = f"{self.base_url}/{animal_id}"
-        self.logger.info(f"Fetching animal {animal_id}...")
+        if self.cache is not None:
+            return self._get_cached_detail(url, animal_id)
+        self.logger.debug("Fetching animal %s...", animal_id)
         resp = self.retry_handler.request_with_retry("GET", url, timeout=self.timeout)
-        return resp.json()
+        return self.serializer.loads(resp.content)
+
+    def get_animal_details_bulk(self, animal_ids):
+        """
+        Fetch details for several animals in one request, with retries.
+        Returns a dict of str(id) -> animal.
+        """
+        params = {self.bulk_detail_param: ",".join(str(i) for i in animal_ids)}
+        self.logger.debug("Fetching %d animals in bulk...", len(animal_ids))
+        resp = self.retry_handler.request_with_retry("GET", self.base_url, params=params, timeout=self.timeout)
+        self.metrics.inc("bulk_detail_requests_total")
+        data = self.serializer.loads(resp.content)
+        animals = data.get("items", []) if isinstance(data, dict) else data
+        return {str(animal["id"]): animal for animal in animals}
+
+    def _get_cached_detail(self, url, animal_id):
+        entry = self.cache.get(url)
+        if entry is not None and entry.fresh:
+            self.metrics.inc("cache_requests_total", labels={"result": "hit"})
+            return self.serializer.loads(entry.body)
+
+        self.logger.debug("Fetching animal %s...", animal_id)
+        headers = self.cache.validators(entry)
+        resp = self.retry_handler.request_with_retry("GET", url, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304 and entry is not None:
+            self.metrics.inc("cache_requests_total", labels={"result": "revalidated"})
+            self.cache.refresh(url)
+            return self.serializer.loads(entry.body)
+
+        animal = self.serializer.loads(resp.content)
+        self.metrics.inc("cache_requests_total", labels={"result": "miss"})
+        self.cache.put(url, resp.content, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return animal
 
     def get_all_animals(self):
         """
         Fetch all animals from the paginated API, with retries per page.
         """
-        all_animals = []
+        return list(self.iter_animals())
+
+    def iter_animals(self):
+        """
+        Yield animals one by one as their pages are fetched.
+
+        With max_concurrency > 1 the detail fetches of a page run on a
+        thread pool and, once total_pages is known, up to page_prefetch
+        page listings (0 = all remaining) are fetched ahead meanwhile.
+        Output order is the same as in sequential mode.
+
+        With shard_count > 1 only pages where (page - 1) % shard_count ==
+        shard_index are extracted; page 1 is always listed to learn
+        total_pages.
+
+        With compact_records, animals are yielded as AnimalRecords.
+
+        With a checkpoint store, each completed page is saved and pages
+        already completed by an earlier run are replayed from it.
+        """
+        if self.max_concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                yield from self._iter_animals(executor)
+        else:
+            yield from self._iter_animals(None)
+
+    def _iter_animals(self, executor):
+        total = 0
         page = 1
         max_pages = None
+        prefetched = {}
+        frontier = None
         self.logger.info("Starting fetch of all animals...")
 
-        while max_pages is None or page <= max_pages:
-            try:
-                resp = self.retry_handler.request_with_retry("GET", self.base_url, params={"page": page}, timeout=self.timeout)
-                if resp is None:
-                    self.logger.error(f"Failed to fetch page {page}, got None")
-                    break
-
-                data = resp.json()
-                if max_pages is None:
-                    max_pages = data.get("total_pages", page)
-                    self.logger.info(f"Total pages detected: {max_pages}")
-
-                items = data.get("items", [])
-                if not items:
-                    break
-
-                for item in items:
-                    animal_detail = self.get_animal_detail(item["id"])
-                    all_animals.append(animal_detail)
-
-                page += 1
-            except Exception as e:
-                self.logger.warning(f"Failed to fetch page {page}: {e}. Skipping page.")
-                page += 1
-
-        self.logger.info(f"Fetched total {len(all_animals)} animals.")
-        return all_animals
+        try:
+            while max_pages is None or page <= max_pages:
+                try:
+                    pending = prefetched.pop(page, None)
+                    restored = self.checkpoint.load_page(page) if self.checkpoint else None
+                    if restored is not None:
+                        total_pages, records = restored
+                        if max_pages is None:
+                            max_pages = total_pages
+                        self.logger.info(f"Restored page {page} from checkpoint.")
+                        for animal_detail in records:
+                            if self.compact:
+                                animal_detail = AnimalRecord.from_dict(animal_detail)
+                            total += 1
+                            self.metrics.inc("records_total", labels={"stage": "extract"})
+                            yield animal_detail
+                        self.metrics.inc("pages_total", labels={"source": "checkpoint"})
+                        page = self._next_page(page)
+                        continue
+
+                    resp = pending.result() if pending else self._fetch_page(page)
+                    if resp is None:
+                        self.logger.error(f"Failed to fetch page {page}, got None")
+                        break
+
+                    data = self.serializer.loads(resp.content)
+                    if max_pages is None:
+                        max_pages = data.get("total_pages", page)
+                        self.logger.info(f"Total pages detected: {max_pages}")
+
+                    items = data.get("items", [])
+                    if not items:
+                        break
+
+                    if executor:
+                        if frontier is None:
+                            frontier = self._next_page(page)
+                        while frontier <= max_pages and (self.page_prefetch <= 0 or len(prefetched) < self.page_prefetch):
+                            if not self._is_checkpointed(frontier):
+                                prefetched[frontier] = executor.submit(self._fetch_page, frontier)
+                            frontier = self._next_page(frontier)
+
+                    if not self._in_shard(page):
+                        # listed only to learn total_pages
+                        page = self._next_page(page)
+                        continue
+
+                    page_snapshots = []
+                    for animal_detail in self._iter_details(items, executor):
+                        if self.checkpoint:
+                            # downstream stages may transform the record in place
+                            # (or concurrently) once it is yielded
+                            page_snapshots.append(self.checkpoint.snapshot(animal_detail))
+                        if self.compact:
+                            animal_detail = AnimalRecord.from_dict(animal_detail)
+                        total += 1
+                        self.metrics.inc("records_total", labels={"stage": "extract"})
+                        if total % Logger.progress_every == 0:
+                            self.logger.info("Fetched %d animals so far...", total)
+                        yield animal_detail
+
+                    if self.checkpoint:
+                        self.checkpoint.save_page_snapshots(page, max_pages, page_snapshots)
+                    self.metrics.inc("pages_total", labels={"source": "api"})
+                    page = self._next_page(page)
+                except (CircuitOpenError, RetryBudgetExhaustedError) as e:
+                    # the upstream as a whole is failing: skipping pages would drop
+                    # every remaining page, so stop and let --resume pick up from here
+                    self.metrics.inc("page_failures_total")
+                    self.logger.error(f"Aborting extraction at page {page}: {e}")
+                    raise
+                except Exception as e:
+                    self.metrics.inc("page_failures_total")
+                    self.logger.warning(f"Failed to fetch page {page}: {e}. Skipping page.")
+                    page = self._next_page(page)
+        finally:
+            for future in prefetched.values():
+                future.cancel()
+
+        self.logger.info(f"Fetched total {total} animals.")
+
+    def _in_shard(self, page):
+        return (page - 1) % self.shard_count == self.shard_index
+
+    def _next_page(self, page):
+        page += 1
+        while not self._in_shard(page):
+            page += 1
+        return page
+
+    def _is_checkpointed(self, page):
+        return self.checkpoint is not None and self.checkpoint.has_page(page)
+
+    def _fetch_page(self, page):
+        return self.retry_handler.request_with_retry("GET", self.base_url, params={"page": page}, timeout=self.timeout)
+
+    def _is_complete(self, item):
+        # a page item already carrying every required field needs no detail fetch
+        return bool(self.required_fields) and all(field in item for field in self.required_fields)
+
+    def _iter_details(self, items, executor):
+        # yields details in page order; a failed fetch raises at its position
+        if self.bulk_detail_param:
+            yield from self._iter_details_bulk(items, executor)
+            return
+
+        if executor is None:
+            for item in items:
+                yield item if self._is_complete(item) else self.get_animal_detail(item["id"])
+            return
+
+        futures = [
+            None if self._is_complete(item) else executor.submit(self.get_animal_detail, item["id"])
+            for item in items
+        ]
+        try:
+            for item, future in zip(items, futures):
+                yield item if future is None else future.result()
+        finally:
+            for future in futures:
+                if future is not None:
+                    future.cancel()
+
+    def _iter_details_bulk(self, items, executor):
+        missing = [item["id"] for item in items if not self._is_complete(item)]
+        groups = [missing[i:i + self.bulk_detail_size] for i in range(0, len(missing), self.bulk_detail_size)]
+        results = executor.map(self.get_animal_details_bulk, groups) if executor else map(self.get_animal_details_bulk, groups)
+
+        details = {}
+        for group in results:
+            details.update(group)
+
+        for item in items:
+            if self._is_complete(item):
+                yield item
+            elif str(item["id"]) in details:
+                yield details[str(item["id"])]
+            else:
+                # not returned by the bulk endpoint, fall back to a single fetch
+                yield self.get_animal_detail(item["id"])
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from .records import to_json_or_str
+
+
+class HashIndex:
+    """
+    Local index of animal ID -> content hash of the last posted version of
+    the transformed record, kept in a SQLite file.
+
+    The index is loaded into memory on open so lookups are dict hits;
+    updates are written through to disk after each posted batch.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS hashes (animal_id TEXT PRIMARY KEY, content_hash TEXT)")
+        self._conn.commit()
+        self._hashes = dict(self._conn.execute("SELECT animal_id, content_hash FROM hashes"))
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def is_changed(self, animal):
+        """
+        True if the animal is new or differs from its last posted version.
+        """
+        animal_id = animal.get("id")
+        if animal_id is None:
+            return True
+        return self._hashes.get(str(animal_id)) != self.content_hash(animal)
+
+    def update(self, animals):
+        rows = [(str(a["id"]), self.content_hash(a)) for a in animals if a.get("id") is not None]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes (animal_id, content_hash) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+            self._hashes.update(rows)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM hashes")
+            self._conn.commit()
+            self._hashes.clear()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def content_hash(animal):
+        payload = json.dumps(animal, sort_keys=True, default=to_json_or_str).encode("utf-8")
+        return hashlib.sha1(payload).hexdigest()
@@ -1,25 +1,184 @@
-import requests
 import time
-from requests.exceptions import RequestException
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 
-from .utils import RetryHandler, Logger
+from .batching import AdaptiveBatcher
+from .metrics import Metrics
+from .serialization import Serializer
+from .utils import RetryHandler, Logger, PayloadTooLargeError
 from .config import Config
 
+# Outcome of posting one batch; error is None on success
+BatchResult = namedtuple("BatchResult", ["index", "size", "elapsed", "error"])
+
 class AnimalLoader:
 
-    def __init__(self, cfg: Config):
+    def __init__(self, cfg: Config, checkpoint=None, hash_index=None):
         self.url = cfg.get_home_url()
         self.batch_size = cfg.get_batch_size()
         self.timeout = cfg.get_timeout()
+        self.max_in_flight = cfg.get_max_in_flight_batches()
+        self.ordered = cfg.get_ordered_completion()
+        self.checkpoint = checkpoint
+        self.hash_index = hash_index
+        self.batcher = AdaptiveBatcher(cfg) if cfg.get_adaptive_batching() else None
+        self.serializer = Serializer(cfg)
         self.retry_handler = RetryHandler(cfg)
+        self.metrics = Metrics.get_metrics()
         self.logger = Logger.get_logger()
 
     def post_animals_batch(self, batch):
+        """
+        Post one batch. A batch rejected as too large (413) is split in
+        halves that are posted in turn, down to single records.
+        """
         self.logger.info(f"Posting batch of {len(batch)} animals...")
-        self.retry_handler.request_with_retry("POST", self.url, json=batch, timeout=self.timeout)
+        body = self.serializer.request_kwargs(batch)
+        try:
+            with self.metrics.timer("batch_post_seconds"):
+                self.retry_handler.request_with_retry("POST", self.url, timeout=self.timeout, **body)
+        except PayloadTooLargeError:
+            if len(batch) < 2:
+                raise
+            self.metrics.inc("batch_splits_total")
+            if self.batcher is not None:
+                self.batcher.record_too_large(len(batch))
+            self.logger.warning(f"Batch of {len(batch)} animals too large, posting it in halves.")
+            half = len(batch) // 2
+            self.post_animals_batch(batch[:half])
+            self.post_animals_batch(batch[half:])
+            return
+        self.metrics.inc("batches_total")
+        self.metrics.inc("records_total", len(batch), {"stage": "load"})
         self.logger.info(f"Posted batch successfully.")
 
+    def is_pending(self, animal):
+        """
+        False if the hash index shows this exact animal was already posted.
+        """
+        return self.hash_index is None or self.hash_index.is_changed(animal)
+
+    def acknowledge(self, batch):
+        """
+        Record a successfully posted batch in the checkpoint and hash index.
+        """
+        if self.checkpoint:
+            self.checkpoint.mark_batch_done(batch)
+        if self.hash_index is not None:
+            self.hash_index.update(batch)
+
     def post_all_animals(self, animals):
-        for i in range(0, len(animals), self.batch_size):
-            batch = animals[i:i+self.batch_size]
+        """
+        Post animals in batches of batch_size. Accepts any iterable, so a
+        generator is consumed and posted as records arrive.
+
+        With adaptive batching, batches are also capped by serialized size
+        and their record count follows observed POST latency and errors.
+
+        With max_in_flight > 1 up to that many batches are posted at once.
+        Returns a BatchResult per batch, in submission order when ordered
+        completion is set and in completion order otherwise. The first
+        failed batch stops further posting and its error is raised.
+
+        With a checkpoint store, acknowledged batches are recorded and
+        batches already posted by an earlier run are skipped.
+
+        With a hash index (incremental mode), only animals that are new or
+        changed since they were last posted are sent.
+        """
+        if self.hash_index is not None:
+            animals = (a for a in animals if self.is_pending(a))
+
+        if self.max_in_flight > 1:
+            return self._post_all_concurrently(animals)
+
+        results = []
+        for index, batch in self._iter_pending_batches(animals):
+            result = self._timed_post(index, batch)
+            if result.error is not None:
+                raise result.error
+            results.append(result)
+        return results
+
+    def _post_all_concurrently(self, animals):
+        results = []
+        errors = []
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            for index, batch in self._iter_pending_batches(animals):
+                while len(pending) >= self.max_in_flight:
+                    self._collect(pending, results, errors)
+                if errors:
+                    break
+                pending.append(executor.submit(self._timed_post, index, batch))
+            while pending:
+                self._collect(pending, results, errors)
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def _collect(self, pending, results, errors):
+        # wait for at least one in-flight batch and record its result
+        if self.ordered:
+            done = [pending.popleft()]
+        else:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            done = [future for future in pending if future in finished]
+            for future in done:
+                pending.remove(future)
+
+        for future in done:
+            result = future.result()
+            results.append(result)
+            if result.error is not None:
+                self.logger.error(f"Batch {result.index} of {result.size} animals failed: {result.error}")
+                errors.append(result.error)
+
+    def post_batch(self, batch):
+        """
+        Post and acknowledge one batch, feeding its outcome to the
+        adaptive batcher. Used by post_all_animals and the pipeline.
+        """
+        start = time.perf_counter()
+        success = False
+        try:
             self.post_animals_batch(batch)
+            self.acknowledge(batch)
+            success = True
+        finally:
+            if self.batcher is not None:
+                self.batcher.record(time.perf_counter() - start, success)
+
+    def _timed_post(self, index, batch):
+        start = time.perf_counter()
+        error = None
+        try:
+            self.post_batch(batch)
+        except Exception as e:
+            error = e
+        return BatchResult(index, len(batch), time.perf_counter() - start, error)
+
+    def _iter_pending_batches(self, animals):
+        for index, batch in enumerate(self.iter_batches(animals)):
+            if self.checkpoint and self.checkpoint.is_batch_done(batch):
+                self.metrics.inc("batches_skipped_total")
+                self.logger.info(f"Skipping batch {index}, already posted.")
+                continue
+            yield index, batch
+
+    def iter_batches(self, animals):
+        """
+        Split animals into batches: capped and sized by the adaptive
+        batcher when adaptive batching is on, else batch_size records.
+        """
+        if self.batcher is not None:
+            yield from self.batcher.iter_batches(animals)
+            return
+        it = iter(animals)
+        while True:
+            batch = list(islice(it, self.batch_size))
+            if not batch:
+                return
+            yield batch
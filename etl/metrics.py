@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) for latency histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def snapshot(self):
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative.append([bound, running])
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": cumulative,
+        }
+
+
+class Metrics:
+    """
+    Process-wide registry of counters, gauges and histograms, shared by
+    every ETL component. flush() hands a snapshot to each registered sink.
+    """
+    _metrics = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self.sinks = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_metrics():
+        if Metrics._metrics is None:
+            with Metrics._instance_lock:
+                if Metrics._metrics is None:
+                    Metrics._metrics = Metrics()
+        return Metrics._metrics
+
+    def inc(self, name, value=1, labels=None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels=None):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, labels=None, buckets=None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets or DEFAULT_BUCKETS)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, labels=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._gauges.items())
+                ],
+                "histograms": [
+                    {"name": name, "labels": dict(labels), **histogram.snapshot()}
+                    for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0])
+                ],
+            }
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def flush(self):
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.emit(snapshot)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.sinks = []
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+class JsonSummarySink:
+    """
+    Writes the snapshot as JSON to a file, or prints it when no path is set.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def emit(self, snapshot):
+        text = json.dumps(snapshot, indent=2)
+        if not self.path:
+            print(text)
+            return
+        _write_atomic(self.path, text)
+
+
+class PrometheusTextFileSink:
+    """
+    Writes the snapshot in the Prometheus text exposition format, e.g. for
+    the node_exporter textfile collector. The file is replaced atomically.
+    """
+
+    def __init__(self, path, prefix="animal_etl_"):
+        self.path = path
+        self.prefix = prefix
+
+    def emit(self, snapshot):
+        lines = []
+        for kind, entries in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+            for name in sorted({e["name"] for e in entries}):
+                lines.append(f"# TYPE {self.prefix}{name} {kind}")
+                for entry in (e for e in entries if e["name"] == name):
+                    lines.append(f"{self.prefix}{name}{_format_labels(entry['labels'])} {entry['value']}")
+        histograms = snapshot["histograms"]
+        for name in sorted({h["name"] for h in histograms}):
+            lines.append(f"# TYPE {self.prefix}{name} histogram")
+            for entry in (h for h in histograms if h["name"] == name):
+                for bound, count in entry["buckets"]:
+                    labels = _format_labels({**entry["labels"], "le": bound})
+                    lines.append(f"{self.prefix}{name}_bucket{labels} {count}")
+                labels = _format_labels({**entry["labels"], "le": "+Inf"})
+                lines.append(f"{self.prefix}{name}_bucket{labels} {entry['count']}")
+                lines.append(f"{self.prefix}{name}_sum{_format_labels(entry['labels'])} {entry['sum']}")
+                lines.append(f"{self.prefix}{name}_count{_format_labels(entry['labels'])} {entry['count']}")
+        _write_atomic(self.path, "\n".join(lines) + "\n")
+
+
+class CallbackSink:
+    """
+    Passes the snapshot to an in-process callable.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def emit(self, snapshot):
+        self.callback(snapshot)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,127 @@
+import queue
+import threading
+
+from .metrics import Metrics
+from .utils import Logger
+from .config import Config
+
+_DONE = object()
+
+# Upper bounds for queue depth histograms
+_DEPTH_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+
+class PipelineExecutor:
+    """
+    Runs extract, transform and load concurrently on worker threads
+    connected by bounded queues. A full queue blocks its producer, so a
+    slow stage applies backpressure upstream instead of buffering the
+    whole dataset.
+
+    Extraction runs on one thread (its own fan-out is governed by
+    max_concurrency); transform and load use a configurable number of
+    workers. With more than one worker per stage, record order across
+    batches is not preserved.
+    """
+
+    def __init__(self, cfg: Config):
+        self.queue_size = cfg.get_queue_size()
+        self.transform_workers = cfg.get_transform_workers()
+        self.load_workers = cfg.get_load_workers()
+        self.metrics = Metrics.get_metrics()
+        self.logger = Logger.get_logger()
+
+    def run(self, extractor, transformer, loader):
+        self._stop = threading.Event()
+        self._errors = []
+        transform_queue = queue.Queue(maxsize=self.queue_size)
+        load_queue = queue.Queue(maxsize=self.queue_size)
+        self._queue_names = {id(transform_queue): "transform", id(load_queue): "load"}
+
+        extract_thread = self._start(self._extract, extractor, transform_queue)
+        transform_threads = [
+            self._start(self._transform, transformer, transform_queue, load_queue)
+            for _ in range(self.transform_workers)
+        ]
+        load_threads = [
+            self._start(self._load, loader, load_queue)
+            for _ in range(self.load_workers)
+        ]
+
+        # shut stages down in order: once a stage is done, tell each
+        # worker of the next stage that no more records are coming
+        extract_thread.join()
+        self._finish(transform_queue, transform_threads)
+        self._finish(load_queue, load_threads)
+
+        if self._errors:
+            raise self._errors[0]
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=self._guard, args=(target, *args), daemon=True)
+        thread.start()
+        return thread
+
+    def _guard(self, target, *args):
+        try:
+            target(*args)
+        except Exception as e:
+            self.logger.error(f"Pipeline stage {target.__name__.strip('_')} failed: {e}")
+            self._errors.append(e)
+            self._stop.set()
+
+    def _finish(self, q, threads):
+        for _ in threads:
+            self._put(q, _DONE)
+        for thread in threads:
+            thread.join()
+
+    def _put(self, q, item):
+        self.metrics.observe("queue_depth", q.qsize(), {"queue": self._queue_names[id(q)]}, _DEPTH_BUCKETS)
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _extract(self, extractor, out_queue):
+        animals = extractor.iter_animals()
+        try:
+            for animal in animals:
+                if not self._put(out_queue, animal):
+                    break
+        finally:
+            animals.close()
+
+    def _transform(self, transformer, in_queue, out_queue):
+        while True:
+            animal = self._get(in_queue)
+            if animal is _DONE:
+                return
+            if not self._put(out_queue, transformer.transform(animal)):
+                return
+
+    def _load(self, loader, in_queue):
+        # batches come from the loader, so adaptive batching applies here too
+        animals = (animal for animal in self._drain(in_queue) if loader.is_pending(animal))
+        for batch in loader.iter_batches(animals):
+            if self._stop.is_set():
+                return
+            loader.post_batch(batch)
+
+    def _drain(self, q):
+        while True:
+            item = self._get(q)
+            if item is _DONE:
+                return
+            yield item
@@ -0,0 +1,117 @@
+import sys
+
+_FIELDS = ("id", "name", "friends", "born_at")
+_MISSING = object()
+
+
+class AnimalRecord:
+    """
+    Compact stand-in for an animal dict, used when compact_records is on.
+
+    Known fields live in __slots__ instead of a per-record dict, names and
+    friend names are interned so repeated values share one string, and the
+    transformed friends list is stored as a tuple. Any other field goes to
+    a small overflow dict. The record supports the dict operations the
+    stages use (item access, get, in) and is only turned back into a dict
+    when it is serialised.
+    """
+    __slots__ = ("id", "name", "friends", "born_at", "extra")
+
+    def __init__(self):
+        self.id = _MISSING
+        self.name = _MISSING
+        self.friends = _MISSING
+        self.born_at = _MISSING
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls()
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    def to_dict(self):
+        data = {key: getattr(self, key) for key in _FIELDS if getattr(self, key) is not _MISSING}
+        if isinstance(data.get("friends"), tuple):
+            data["friends"] = list(data["friends"])
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in _FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "name" and isinstance(value, str):
+            value = sys.intern(value)
+        elif key == "friends" and isinstance(value, list):
+            value = tuple(sys.intern(f) for f in value)
+        if key in _FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if isinstance(other, AnimalRecord):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"AnimalRecord({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__()
+        for key, value in state.items():
+            self[key] = value
+
+
+def materialize(obj):
+    """
+    Turn a record, or a list of records, into plain dicts.
+    """
+    if isinstance(obj, AnimalRecord):
+        return obj.to_dict()
+    if isinstance(obj, (list, tuple)):
+        return [a.to_dict() if isinstance(a, AnimalRecord) else a for a in obj]
+    return obj
+
+
+def to_json(obj):
+    # default= hook for JSON encoders
+    if isinstance(obj, AnimalRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_json_or_str(obj):
+    # default= hook for content hashes, which stringify anything else
+    if isinstance(obj, AnimalRecord):
+        return obj.to_dict()
+    return str(obj)
@@ -0,0 +1,91 @@
+import gzip
+import json
+
+from .config import Config
+from .records import materialize, to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Serializer:
+    """
+    JSON encoding/decoding with a pluggable backend and optional request
+    body compression.
+
+    json_backend is "auto" (orjson, then msgspec, then stdlib), or one of
+    "orjson", "msgspec", "json". request_compression is "none", "gzip"
+    or "zstd"; bodies smaller than compression_min_bytes are sent as-is.
+    Response decompression and Accept-Encoding are handled by requests,
+    which advertises gzip/deflate plus br and zstd when their decoders are
+    installed.
+    """
+
+    def __init__(self, cfg: Config):
+        self.backend = self._resolve_backend(cfg.get_json_backend())
+        self.compression = cfg.get_request_compression() or "none"
+        self.compression_min_bytes = cfg.get_compression_min_bytes()
+        if self.compression not in ("none", "gzip", "zstd"):
+            raise ValueError(f"Unknown request_compression: {self.compression}")
+        if self.compression == "zstd" and zstandard is None:
+            raise ImportError("request_compression 'zstd' requires the optional 'zstandard' package")
+
+    def dumps(self, obj) -> bytes:
+        if self.backend == "orjson":
+            return orjson.dumps(obj, default=to_json)
+        if self.backend == "msgspec":
+            return msgspec.json.encode(obj, enc_hook=to_json)
+        return json.dumps(obj, default=to_json).encode("utf-8")
+
+    def loads(self, data):
+        if self.backend == "orjson":
+            return orjson.loads(data)
+        if self.backend == "msgspec":
+            return msgspec.json.decode(data)
+        return json.loads(data)
+
+    def request_kwargs(self, obj):
+        """
+        Keyword arguments for sending obj as a JSON request body. With the
+        stdlib backend and no compression, requests encodes it itself.
+        """
+        if self.backend == "json" and self.compression == "none":
+            return {"json": materialize(obj)}
+
+        body = self.dumps(obj)
+        headers = {"Content-Type": "application/json"}
+        if self.compression != "none" and len(body) >= self.compression_min_bytes:
+            if self.compression == "gzip":
+                body = gzip.compress(body, compresslevel=5)
+            else:
+                body = zstandard.ZstdCompressor().compress(body)
+            headers["Content-Encoding"] = self.compression
+        return {"data": body, "headers": headers}
+
+    @staticmethod
+    def _resolve_backend(name):
+        if name == "auto":
+            if orjson is not None:
+                return "orjson"
+            if msgspec is not None:
+                return "msgspec"
+            return "json"
+        if name == "orjson" and orjson is None:
+            raise ImportError("json_backend 'orjson' requires the optional 'orjson' package")
+        if name == "msgspec" and msgspec is None:
+            raise ImportError("json_backend 'msgspec' requires the optional 'msgspec' package")
+        if name not in ("orjson", "msgspec", "json"):
+            raise ValueError(f"Unknown json_backend: {name}")
+        return name
@@ -0,0 +1,228 @@
+import glob
+import gzip
+import io
+import mmap
+import os
+import threading
+import time
+from itertools import islice
+
+from .config import Config
+from .load import BatchResult
+from .metrics import Metrics
+from .records import materialize
+from .serialization import Serializer
+from .utils import Logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+_EXTENSIONS = {
+    ("ndjson", "none"): ".ndjson",
+    ("ndjson", "gzip"): ".ndjson.gz",
+    ("ndjson", "zstd"): ".ndjson.zst",
+    ("parquet", "none"): ".parquet",
+    ("parquet", "gzip"): ".parquet",
+    ("parquet", "zstd"): ".parquet",
+}
+
+
+def _import_parquet():
+    # pyarrow is slow to import, so only Parquet staging pays for it
+    try:
+        import pyarrow
+        import pyarrow.parquet as parquet
+    except ImportError as e:
+        raise ImportError("staging_format 'parquet' requires the optional 'pyarrow' package") from e
+    return pyarrow, parquet
+
+
+class StagingFormat:
+    """
+    Layout of a staging directory: numbered part files of at most
+    staging_chunk_records records each, as newline-delimited JSON
+    (optionally gzip or zstd compressed) or Parquet.
+    """
+
+    def __init__(self, cfg: Config, directory=None):
+        self.directory = directory or cfg.get_staging_dir()
+        self.format = cfg.get_staging_format()
+        self.compression = cfg.get_staging_compression() or "none"
+        self.chunk_records = cfg.get_staging_chunk_records()
+        if (self.format, self.compression) not in _EXTENSIONS:
+            raise ValueError(f"Unknown staging format/compression: {self.format}/{self.compression}")
+        if self.format == "parquet":
+            _import_parquet()
+        if self.format == "ndjson" and self.compression == "zstd" and zstandard is None:
+            raise ImportError("staging_compression 'zstd' requires the optional 'zstandard' package")
+        self.extension = _EXTENSIONS[(self.format, self.compression)]
+
+    def part_path(self, index):
+        return os.path.join(self.directory, f"part-{index:05d}{self.extension}")
+
+    def part_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, f"part-*{self.extension}")))
+
+
+class FileLoader:
+    """
+    Loader that writes transformed animals to a local staging directory
+    instead of posting them. Drop-in for AnimalLoader in every run mode.
+
+    Each part file is written to a temporary name and renamed when
+    complete, so a reader never sees a partial part. A run removes the
+    parts left by the previous one before it writes anything, even when it
+    has no records to write.
+    """
+
+    def __init__(self, cfg: Config, directory=None):
+        self.staging = StagingFormat(cfg, directory)
+        self.batch_size = self.staging.chunk_records
+        self.serializer = Serializer(cfg)
+        self.metrics = Metrics.get_metrics()
+        self.logger = Logger.get_logger()
+        self._next_index = 0
+        self._started = False
+        self._lock = threading.Lock()
+
+    def post_animals_batch(self, batch):
+        self._start()
+        with self._lock:
+            index = self._next_index
+            self._next_index += 1
+        path = self.staging.part_path(index)
+        self.logger.info(f"Writing {len(batch)} animals to {path}...")
+        with self.metrics.timer("staging_write_seconds"):
+            self._write_part(path, batch)
+        self.metrics.inc("records_total", len(batch), {"stage": "load"})
+
+    def is_pending(self, animal):
+        return True
+
+    def acknowledge(self, batch):
+        pass
+
+    def post_batch(self, batch):
+        self.post_animals_batch(batch)
+
+    def iter_batches(self, animals):
+        # clears the previous run now, not on the first batch, which may never come
+        self._start()
+        return self._chunks(animals)
+
+    def _chunks(self, animals):
+        it = iter(animals)
+        while True:
+            batch = list(islice(it, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def post_all_animals(self, animals):
+        """
+        Write animals to part files of staging_chunk_records records.
+        Returns a BatchResult per part file, like AnimalLoader.
+        """
+        results = []
+        for index, batch in enumerate(self.iter_batches(animals)):
+            start = time.perf_counter()
+            self.post_animals_batch(batch)
+            results.append(BatchResult(index, len(batch), time.perf_counter() - start, None))
+        self.logger.info(f"Staged {sum(r.size for r in results)} animals in {self.staging.directory}.")
+        return results
+
+    def _start(self):
+        with self._lock:
+            if not self._started:
+                self._clear()
+                self._started = True
+
+    def _clear(self):
+        os.makedirs(self.staging.directory, exist_ok=True)
+        for path in glob.glob(os.path.join(self.staging.directory, "part-*")):
+            os.remove(path)
+
+    def _write_part(self, path, batch):
+        tmp_path = f"{path}.tmp"
+        if self.staging.format == "parquet":
+            pyarrow, parquet = _import_parquet()
+            table = pyarrow.Table.from_pylist(materialize(batch))
+            parquet.write_table(table, tmp_path, compression=self.staging.compression)
+        else:
+            body = b"".join(self.serializer.dumps(animal) + b"\n" for animal in batch)
+            if self.staging.compression == "gzip":
+                body = gzip.compress(body, compresslevel=5)
+            elif self.staging.compression == "zstd":
+                body = zstandard.ZstdCompressor().compress(body)
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+        os.replace(tmp_path, path)
+
+
+class FileExtractor:
+    """
+    Extractor that replays animals from a staging directory written by
+    FileLoader, part by part, through memory-mapped reads. Memory stays
+    at about one record (NDJSON) or one row group (Parquet).
+    """
+
+    def __init__(self, cfg: Config, directory=None):
+        self.staging = StagingFormat(cfg, directory)
+        self.serializer = Serializer(cfg)
+        self.metrics = Metrics.get_metrics()
+        self.logger = Logger.get_logger()
+
+    def get_all_animals(self):
+        return list(self.iter_animals())
+
+    def iter_animals(self):
+        paths = self.staging.part_paths()
+        if not paths:
+            raise FileNotFoundError(f"No staged {self.staging.extension} files in {self.staging.directory}")
+        self.logger.info(f"Replaying {len(paths)} staged files from {self.staging.directory}...")
+        total = 0
+        for path in paths:
+            for animal in self._read_part(path):
+                total += 1
+                self.metrics.inc("records_total", labels={"stage": "extract"})
+                yield animal
+        self.logger.info(f"Replayed total {total} animals.")
+
+    def _read_part(self, path):
+        if self.staging.format == "parquet":
+            _, parquet = _import_parquet()
+            for batch in parquet.ParquetFile(path, memory_map=True).iter_batches():
+                yield from batch.to_pylist()
+            return
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if self.staging.compression == "gzip":
+                stream = gzip.GzipFile(fileobj=mm)
+            elif self.staging.compression == "zstd":
+                stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(mm))
+            else:
+                stream = mm
+            for line in iter(stream.readline, b""):
+                if line.strip():
+                    yield self.serializer.loads(line)
+
+
+class PassthroughTransformer:
+    """
+    Transformer for replaying staged records, which are already transformed.
+    """
+
+    def transform(self, animal):
+        return animal
+
+    def transform_all(self, animals):
+        return iter(animals)
+
+    def transform_batch(self, animals):
+        return animals
+
+    def close(self):
+        pass
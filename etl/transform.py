@@ -1,18 +1,93 @@
-from dateutil import parser
-from datetime import timezone
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 
+from .metrics import Metrics
 from .utils import Logger
 
+# Strict ISO-8601 shapes that datetime.fromisoformat parses exactly like
+# dateutil; anything else goes through dateutil
+_ISO_DATETIME = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?(?:Z|[+-]\d{2}:\d{2})?)?"
+)
+
+
+@lru_cache(maxsize=8192)
+def parse_born_at(value):
+    """
+    Parse a born_at string and return it as an ISO8601 UTC string.
+    Repeated timestamps are served from a bounded cache.
+    """
+    dt = None
+    if _ISO_DATETIME.fullmatch(value):
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            dt = None
+    if dt is None:
+        # dateutil is only needed for non-ISO input, so import it on first use
+        from dateutil import parser
+        dt = parser.parse(value)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
 class AnimalTransformer:
 
-    def __init__(self):
+    def __init__(self, processes=1, chunk_size=1000):
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self._executor = None
+        self.metrics = Metrics.get_metrics()
         self.logger = Logger.get_logger()
 
     def transform(self, animal: dict) -> dict:
         self._transform_friends(animal)
         self._transform_born_at(animal)
+        self.metrics.inc("records_total", labels={"stage": "transform"})
         return animal
-    
+
+    def transform_all(self, animals):
+        """
+        Lazily transform an iterable of animals, one record at a time.
+        """
+        for animal in animals:
+            yield self.transform(animal)
+
+    def transform_batch(self, animals: list) -> list:
+        """
+        Transform a page or batch of animals in one pass per column.
+        Each distinct born_at value is parsed once for the whole batch.
+        Results are identical to calling transform() on each record.
+
+        With processes > 1, batches larger than chunk_size are split into
+        chunks that are transformed on a process pool and reassembled in
+        order. The pool is started on first use and kept until close().
+        """
+        self.metrics.inc("records_total", len(animals), {"stage": "transform"})
+        if self.processes > 1 and len(animals) > self.chunk_size:
+            return self._transform_batch_parallel(animals)
+
+        friends_column = [a.get("friends", "") for a in animals]
+        born_at_column = [a.get("born_at") for a in animals]
+
+        parsed = {}
+        for born_at in {b for b in born_at_column if isinstance(b, str) and b}:
+            try:
+                parsed[born_at] = parse_born_at(born_at)
+            except Exception as e:
+                parsed[born_at] = e
+
+        for animal, friends_str, born_at in zip(animals, friends_column, born_at_column):
+            animal["friends"] = [f.strip() for f in friends_str.split(",") if f.strip()]
+            result = parsed.get(born_at) if isinstance(born_at, str) else None
+            if isinstance(result, Exception):
+                self.logger.info("Warning: Could not parse born_at for animal %s: %s, error: %s", animal['id'], born_at, result)
+                result = None
+            animal["born_at"] = result
+        return animals
+
     def _transform_friends(self, animal):
         # convert : friends string -> list
         friends_str = animal.get("friends", "")
@@ -23,10 +98,46 @@ class AnimalTransformer:
         born_at = animal.get("born_at")
         if born_at and isinstance(born_at, str):  # only parse if it's a non-empty string
             try:
-                dt = parser.parse(born_at)
-                animal["born_at"] = dt.astimezone(timezone.utc).isoformat()
+                animal["born_at"] = parse_born_at(born_at)
             except Exception as e:
-                self.logger.info(f"Warning: Could not parse born_at for animal {animal['id']}: {born_at}, error: {e}")
+                self.logger.info("Warning: Could not parse born_at for animal %s: %s, error: %s", animal['id'], born_at, e)
                 animal["born_at"] = None
         else:
             animal["born_at"] = None
+
+    def _transform_batch_parallel(self, animals):
+        chunks = [animals[i:i + self.chunk_size] for i in range(0, len(animals), self.chunk_size)]
+        self.logger.info(f"Transforming {len(animals)} animals in {len(chunks)} chunks on {self.processes} processes...")
+        if self._executor is None:
+            # spawn rather than fork: forking while the log listener and the
+            # extract/load thread pools run can copy a held lock into the child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        transformed = []
+        for chunk in self._executor.map(_transform_chunk, chunks):
+            transformed.extend(chunk)
+        return transformed
+
+    def close(self):
+        """
+        Shut down the worker pool, if one was started.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# one transformer per worker process, created by the pool initializer
+_worker_transformer = None
+
+
+def _init_worker():
+    global _worker_transformer
+    _worker_transformer = AnimalTransformer()
+
+
+def _transform_chunk(chunk):
+    return _worker_transformer.transform_batch(chunk)
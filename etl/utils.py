@@ -1,59 +1,614 @@
+import random
 import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+import atexit
 import logging
 import os
-from datetime import datetime
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 
 from .config import Config
+from .metrics import Metrics
+
+class CircuitOpenError(Exception):
+    """
+    Raised without sending a request while an endpoint's circuit is open.
+    """
+
+
+class RetryBudgetExhaustedError(Exception):
+    """
+    Raised instead of retrying once the process-wide retry budget is spent.
+    """
+
+
+class ClientStatusError(Exception):
+    """
+    Raised without retrying on a 4xx response other than 429: the request
+    itself was rejected, so sending it again would not help. The endpoint
+    did answer, so it does not count against its circuit either.
+    """
+
+    def __init__(self, status_code, url):
+        super().__init__(f"Client error {status_code} for {url}")
+        self.status_code = status_code
+
+
+class PayloadTooLargeError(ClientStatusError):
+    """
+    Raised on a 413 response: the same body would be rejected again.
+    """
+
+    def __init__(self, url):
+        super().__init__(413, url)
+
+
+# statuses that mean the endpoint is unwell rather than the request wrong
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryableStatusError(RequestException):
+    """
+    A response status worth retrying, with the server's Retry-After if any.
+    """
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"Server error {status_code}")
+        self.retry_after = retry_after
+
 
 class RetryHandler:
+    """
+    Sends requests through the shared session with rate limiting, a
+    circuit breaker per endpoint and retries. Retries wait
+    backoff_factor ** attempt seconds, capped at max_backoff_seconds and
+    randomised with full jitter so workers do not retry in lockstep; a
+    Retry-After header is used instead, also capped at max_backoff_seconds,
+    and pauses every request to the endpoint. Retries also draw on a process-wide
+    retry budget, so a failing upstream cannot multiply the request load.
+
+    The circuit breaker counts failed requests, not failed attempts: a
+    request that fails after all its retries is one failure. Responses
+    other than 429 and 5xx count as the endpoint being up.
+    """
 
     def __init__(self, cfg: Config):
+        self.cfg = cfg
         self.max_attempts = cfg.get_max_attempts()
         self.backoff_factor = cfg.get_backoff_factor()
+        self.max_backoff = cfg.get_max_backoff()
+        self.jitter = cfg.get_retry_jitter()
+        self.session = HttpSession.get_session(cfg)
+        self.rate_limiter = RateLimiter.get_limiter(cfg)
+        self.retry_budget = RetryBudget.get_budget(cfg)
+        self.metrics = Metrics.get_metrics()
 
     def request_with_retry(self, method, url, **kwargs):
+        bucket = self.rate_limiter.for_url(url)
+        breaker = CircuitBreaker.get_breaker(self.cfg, url)
+        self.retry_budget.record_request()
         for attempt in range(1, self.max_attempts + 1):
+            self._check_circuit(method, url, breaker)
+            answered = False
+            wait_time = None
             try:
-                resp = requests.request(method, url, **kwargs)
-                if resp.status_code in (500, 502, 503, 504):
-                    raise RequestException(f"Server error {resp.status_code}")
+                bucket.acquire()
+                start = time.perf_counter()
+                resp = self.session.request(method, url, **kwargs)
+                self._record_response(method, resp, time.perf_counter() - start, kwargs)
+                answered = resp.status_code < 500 and resp.status_code != 429
+                self._check_status(resp, bucket)
                 resp.raise_for_status()
                 return resp
             except RequestException as e:
-                wait_time = self.backoff_factor ** attempt
-                Logger.get_logger().warning(f"{method} request failed for {url}: {e}. Retrying in {wait_time}s (attempt {attempt}/{self.max_attempts})...")
-                time.sleep(wait_time)
+                wait_time = self._on_failure(method, url, e, attempt)
+            finally:
+                # resolve every attempt, so a half-open trial never stays in flight
+                self._record_outcome(breaker, answered, wait_time)
+            if wait_time is None:
+                break
+            time.sleep(wait_time)
         raise Exception(f"Failed to {method} {url} after {self.max_attempts} attempts")
 
+    async def request_with_retry_async(self, method, url, **kwargs):
+        """
+        Asyncio counterpart of request_with_retry using the shared async
+        client; waits with asyncio.sleep so the event loop is never blocked.
+        """
+        client = HttpSession.get_async_client(self.cfg)
+        errors = _async_request_errors()
+        bucket = self.rate_limiter.for_url(url)
+        breaker = CircuitBreaker.get_breaker(self.cfg, url)
+        self.retry_budget.record_request()
+        for attempt in range(1, self.max_attempts + 1):
+            self._check_circuit(method, url, breaker)
+            answered = False
+            wait_time = None
+            try:
+                await bucket.acquire_async()
+                start = time.perf_counter()
+                resp = await client.request(method, url, **kwargs)
+                self._record_response(method, resp, time.perf_counter() - start, kwargs)
+                answered = resp.status_code < 500 and resp.status_code != 429
+                self._check_status(resp, bucket)
+                resp.raise_for_status()
+                return resp
+            except errors as e:
+                wait_time = self._on_failure(method, url, e, attempt)
+            finally:
+                self._record_outcome(breaker, answered, wait_time)
+            if wait_time is None:
+                break
+            await _async_sleep(wait_time)
+        raise Exception(f"Failed to {method} {url} after {self.max_attempts} attempts")
+
+    def backoff_time(self, attempt):
+        wait_time = min(self.max_backoff, self.backoff_factor ** attempt)
+        if self.jitter:
+            wait_time = random.uniform(0, wait_time)
+        return wait_time
+
+    def _record_response(self, method, resp, elapsed, kwargs):
+        labels = {"method": method}
+        self.metrics.observe("http_request_seconds", elapsed, labels)
+        self.metrics.inc("http_requests_total", labels={"method": method, "status": resp.status_code})
+        self.metrics.inc("http_response_bytes_total", len(resp.content), labels)
+        body = kwargs.get("data")
+        if isinstance(body, (bytes, str)):
+            self.metrics.inc("http_request_bytes_total", len(body), labels)
+
+    def _check_circuit(self, method, url, breaker):
+        if not breaker.allow():
+            self.metrics.inc("http_circuit_rejections_total", labels={"method": method})
+            raise CircuitOpenError(f"Circuit open for {url}, not sending {method} request")
+
+    def _check_status(self, resp, bucket):
+        if resp.status_code == 413:
+            raise PayloadTooLargeError(resp.url)
+        if 400 <= resp.status_code < 500 and resp.status_code != 429:
+            raise ClientStatusError(resp.status_code, resp.url)
+        if resp.status_code in RETRYABLE_STATUSES:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if retry_after is not None:
+                retry_after = min(retry_after, self.max_backoff)
+                # hold every worker on this endpoint, not just this one
+                bucket.pause(retry_after)
+            raise RetryableStatusError(resp.status_code, retry_after)
+
+    @staticmethod
+    def _record_outcome(breaker, answered, wait_time):
+        # only the last failed attempt of a request counts towards the threshold
+        if answered:
+            breaker.record_success()
+        else:
+            breaker.record_failure(final=wait_time is None)
+
+    def _on_failure(self, method, url, error, attempt):
+        # returns the time to wait before the next attempt, or None after the last one
+        self.metrics.inc("http_request_failures_total", labels={"method": method})
+        if attempt >= self.max_attempts:
+            Logger.get_logger().warning(f"{method} request failed for {url}: {error} (attempt {attempt}/{self.max_attempts}).")
+            return None
+        if not self.retry_budget.try_spend():
+            raise RetryBudgetExhaustedError(f"Retry budget exhausted, giving up on {method} {url}: {error}")
+        self.metrics.inc("http_retries_total", labels={"method": method})
+        retry_after = getattr(error, "retry_after", None)
+        wait_time = retry_after if retry_after is not None else self.backoff_time(attempt)
+        Logger.get_logger().warning(f"{method} request failed for {url}: {error}. Retrying in {wait_time:.2f}s (attempt {attempt}/{self.max_attempts})...")
+        return wait_time
+
+
+def _async_request_errors():
+    try:
+        import httpx
+    except ImportError:
+        return (RequestException,)
+    return (RequestException, httpx.HTTPError)
+
+
+async def _async_sleep(seconds):
+    # asyncio is only imported by async callers, keeping it out of startup
+    import asyncio
+    await asyncio.sleep(seconds)
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries: at any time the number of retries may not
+    exceed min_retries + ratio * requests.
+    """
+    _budget = None
+    _budget_lock = threading.Lock()
+
+    def __init__(self, ratio, min_retries):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._requests = 0
+        self._retries = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_budget(cfg: Config):
+        if RetryBudget._budget is None:
+            with RetryBudget._budget_lock:
+                if RetryBudget._budget is None:
+                    RetryBudget._budget = RetryBudget(cfg.get_retry_budget_ratio(), cfg.get_retry_budget_min())
+        return RetryBudget._budget
+
+    @staticmethod
+    def reset():
+        with RetryBudget._budget_lock:
+            RetryBudget._budget = None
+
+    def record_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def try_spend(self):
+        with self._lock:
+            if self._retries >= self.min_retries + self.ratio * self._requests:
+                return False
+            self._retries += 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker. After `threshold` consecutive failures
+    the circuit opens and requests fail fast for `reset_seconds`; then a
+    single trial request is let through and its result closes or re-opens
+    the circuit. Endpoints are the configured animals/home URLs, or the
+    host for other URLs.
+    """
+    _breakers = {}
+    _breakers_lock = threading.Lock()
+
+    def __init__(self, threshold, reset_seconds):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_breaker(cfg: Config, url):
+        prefixes = [p for p in (cfg.get_animals_url(), cfg.get_home_url()) if p and url.startswith(p)]
+        key = max(prefixes, key=len) if prefixes else urlsplit(url).netloc
+        with CircuitBreaker._breakers_lock:
+            breaker = CircuitBreaker._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(cfg.get_circuit_failure_threshold(), cfg.get_circuit_reset_seconds())
+                CircuitBreaker._breakers[key] = breaker
+        return breaker
+
+    @staticmethod
+    def reset():
+        with CircuitBreaker._breakers_lock:
+            CircuitBreaker._breakers = {}
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, final=True):
+        """
+        Record a failed attempt. Only the final attempt of a request counts
+        towards the threshold; a failed half-open trial re-opens either way.
+        """
+        with self._lock:
+            if final:
+                self._failures += 1
+            if self._trial_in_flight or (final and self._failures >= self.threshold):
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date),
+    or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `rate` requests per second with
+    bursts of up to `burst` requests. With rate 0 it only enforces pauses.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        wait_time = self._reserve()
+        while wait_time:
+            time.sleep(wait_time)
+            wait_time = self._reserve()
+
+    async def acquire_async(self):
+        wait_time = self._reserve()
+        while wait_time:
+            await _async_sleep(wait_time)
+            wait_time = self._reserve()
+
+    def _reserve(self):
+        # takes a token and returns 0, or returns how long to wait for one
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate <= 0:
+                return 0
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Process-wide token buckets per endpoint, shared by every RetryHandler
+    and worker thread. A request is limited by the bucket of the longest
+    configured URL prefix it starts with. Endpoints without a rate limit,
+    and other hosts, get a bucket that only enforces Retry-After pauses.
+    """
+    _limiter = None
+    _lock = threading.Lock()
+
+    def __init__(self, buckets, burst=1):
+        self.buckets = buckets
+        self.burst = burst
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    @staticmethod
+    def get_limiter(cfg: Config):
+        if RateLimiter._limiter is None:
+            with RateLimiter._lock:
+                if RateLimiter._limiter is None:
+                    burst = cfg.get_rate_limit_burst()
+                    limits = {
+                        cfg.get_animals_url(): cfg.get_animals_rate_limit(),
+                        cfg.get_home_url(): cfg.get_home_rate_limit(),
+                    }
+                    buckets = {url: TokenBucket(rate, burst) for url, rate in limits.items() if url}
+                    RateLimiter._limiter = RateLimiter(buckets, burst)
+        return RateLimiter._limiter
+
+    @staticmethod
+    def reset():
+        with RateLimiter._lock:
+            RateLimiter._limiter = None
+
+    def for_url(self, url):
+        matches = [prefix for prefix in self.buckets if url.startswith(prefix)]
+        if matches:
+            return self.buckets[max(matches, key=len)]
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            bucket = self._hosts.get(host)
+            if bucket is None:
+                bucket = self._hosts[host] = TokenBucket(0, self.burst)
+        return bucket
+
+
+class HttpSession:
+    """
+    Process-wide pooled HTTP clients shared by every RetryHandler, so
+    connections are kept alive between requests instead of being
+    re-established per call.
+    """
+    _session = None
+    _async_client = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_session(cfg: Config):
+        if HttpSession._session is None:
+            with HttpSession._lock:
+                if HttpSession._session is None:
+                    pool_size = cfg.get_pool_maxsize()
+                    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                    session = requests.Session()
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    HttpSession._session = session
+        return HttpSession._session
+
+    @staticmethod
+    def get_async_client(cfg: Config):
+        """
+        Shared httpx.AsyncClient for asyncio callers. Requires the optional
+        `httpx` package; HTTP/2 is used when enabled and `h2` is installed.
+        """
+        if HttpSession._async_client is None:
+            try:
+                import httpx
+            except ImportError as e:
+                raise ImportError("The async client requires the optional 'httpx' package") from e
+            http2 = cfg.get_http2()
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    http2 = False
+            pool_size = cfg.get_pool_maxsize()
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            HttpSession._async_client = httpx.AsyncClient(http2=http2, limits=limits)
+        return HttpSession._async_client
+
+    @staticmethod
+    def close():
+        with HttpSession._lock:
+            if HttpSession._session is not None:
+                HttpSession._session.close()
+                HttpSession._session = None
+
+    @staticmethod
+    async def aclose():
+        if HttpSession._async_client is not None:
+            await HttpSession._async_client.aclose()
+            HttpSession._async_client = None
+
 
 class Logger:
+    """
+    Shared ETL logger. Records are handed to a queue and written to the
+    log file and console by a background QueueListener, so callers never
+    block on disk or terminal I/O. Levels and the progress interval come
+    from config via configure().
+    """
     _logger = None
+    _listener = None
+    _lock = threading.Lock()
+    level = logging.INFO
+    console_level = logging.INFO
+    # per-record messages are logged at DEBUG; INFO gets a progress line every N records
+    progress_every = 1000
+
+    @staticmethod
+    def configure(cfg: Config):
+        Logger.level = Logger._parse_level(cfg.get_log_level())
+        Logger.console_level = Logger._parse_level(cfg.get_console_log_level())
+        Logger.progress_every = max(1, cfg.get_log_progress_every())
+        if Logger._logger is not None:
+            Logger._apply_levels()
 
     @staticmethod
     def get_logger():
         if Logger._logger is None:
-            os.makedirs("logs", exist_ok=True)
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            log_file = f"logs/etl_{timestamp}.log"
+            with Logger._lock:
+                if Logger._logger is None:
+                    Logger._logger = Logger._create_logger()
+        return Logger._logger
 
-            Logger._logger = logging.getLogger("ETLLogger")
-            Logger._logger.setLevel(logging.INFO)
+    @staticmethod
+    def shutdown():
+        """
+        Flush queued records and stop the background listener.
+        """
+        if Logger._listener is not None:
+            Logger._listener.stop()
+            Logger._listener = None
 
-            # File handler
-            fh = logging.FileHandler(log_file)
-            fh.setLevel(logging.INFO)
+    @staticmethod
+    def _after_fork():
+        # the listener thread does not survive fork, so a forked child
+        # (e.g. a transform worker) writes to the handlers directly
+        if Logger._logger is None:
+            return
+        Logger._listener = None
+        for handler in list(Logger._logger.handlers):
+            if isinstance(handler, QueueHandler):
+                Logger._logger.removeHandler(handler)
+        Logger._logger.addHandler(Logger._file_handler)
+        Logger._logger.addHandler(Logger._console_handler)
+
+    @staticmethod
+    def _parse_level(name):
+        level = logging.getLevelName(str(name).upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {name}")
+        return level
 
-            # Console handler
-            ch = logging.StreamHandler()
-            ch.setLevel(logging.INFO)
+    @staticmethod
+    def _create_logger():
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        log_file = f"logs/etl_{timestamp}.log"
 
-            # Formatter
-            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            fh.setFormatter(formatter)
-            ch.setFormatter(formatter)
+        logger = logging.getLogger("ETLLogger")
 
-            Logger._logger.addHandler(fh)
-            Logger._logger.addHandler(ch)
-        return Logger._logger
+        # File handler; the file is only created once a record reaches it
+        fh = _LazyFileHandler(log_file)
+
+        # Console handler
+        ch = logging.StreamHandler()
+
+        # Formatter
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        fh.setFormatter(formatter)
+        ch.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        Logger._listener = QueueListener(log_queue, fh, ch, respect_handler_level=True)
+        Logger._listener.start()
+        atexit.register(Logger.shutdown)
+
+        logger.addHandler(QueueHandler(log_queue))
+        Logger._file_handler = fh
+        Logger._console_handler = ch
+        Logger._logger = logger
+        Logger._apply_levels()
+        return logger
+
+    @staticmethod
+    def _apply_levels():
+        Logger._logger.setLevel(min(Logger.level, Logger.console_level))
+        Logger._file_handler.setLevel(Logger.level)
+        Logger._console_handler.setLevel(Logger.console_level)
+
+
+class _LazyFileHandler(logging.FileHandler):
+    """
+    FileHandler that creates its directory and file on the first record,
+    so runs that log nothing to the file leave nothing behind.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        directory = os.path.dirname(self.baseFilename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return super()._open()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=Logger._after_fork)
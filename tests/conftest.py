@@ -0,0 +1,8 @@
+import pytest
+
+from tests.helpers import make_mock_config
+
+
+@pytest.fixture
+def mock_config():
+    return make_mock_config()
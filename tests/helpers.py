@@ -0,0 +1,30 @@
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+import yaml
+
+from etl.config import Config
+
+# Applied on top of the schema defaults for every test config
+TEST_SETTINGS = {
+    "animals_url": "http://fakeapi.com/animals",
+    "home_url": "http://fake-url.com",
+    "timeout_seconds": 5,
+    "json_backend": "json",
+}
+
+
+def make_mock_config(**settings):
+    """
+    A MagicMock wrapping a real, validated Config built from the schema
+    defaults, TEST_SETTINGS and settings. Getters return those values
+    unless a test overrides one with `cfg.get_x.return_value = ...`.
+    """
+    fd, path = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(fd, "w") as f:
+        yaml.safe_dump({**TEST_SETTINGS, **settings}, f)
+    try:
+        return MagicMock(wraps=Config(path, environ={}))
+    finally:
+        os.remove(path)
@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import MagicMock
+
+from etl.animal_etl_manager import AnimalETLManager
+
+
+@pytest.fixture
+def extractor():
+    extractor = MagicMock()
+    extractor.get_all_animals.return_value = [{"id": 1}, {"id": 2}]
+    extractor.iter_animals.side_effect = lambda: iter([{"id": 1}, {"id": 2}])
+    return extractor
+
+
+@pytest.fixture
+def transformer():
+    transformer = MagicMock()
+    transformer.transform.side_effect = lambda a: {**a, "transformed": True}
+    transformer.transform_batch.side_effect = lambda animals: [transformer.transform(a) for a in animals]
+    transformer.transform_all.side_effect = lambda animals: (transformer.transform(a) for a in animals)
+    return transformer
+
+
+@pytest.fixture
+def loader():
+    loader = MagicMock()
+    loader.posted = []
+    loader.post_all_animals.side_effect = lambda animals: loader.posted.extend(animals)
+    return loader
+
+
+def test_run_materialises_and_loads_all(extractor, transformer, loader):
+    AnimalETLManager(extractor, transformer, loader).run()
+
+    extractor.get_all_animals.assert_called_once()
+    extractor.iter_animals.assert_not_called()
+    assert loader.posted == [{"id": 1, "transformed": True}, {"id": 2, "transformed": True}]
+
+
+def test_run_streaming_passes_lazy_iterable_to_loader(extractor, transformer, loader):
+    received = []
+    loader.post_all_animals.side_effect = lambda animals: received.append(animals)
+
+    AnimalETLManager(extractor, transformer, loader, streaming=True).run()
+
+    extractor.get_all_animals.assert_not_called()
+    assert not isinstance(received[0], list)
+    assert list(received[0]) == [{"id": 1, "transformed": True}, {"id": 2, "transformed": True}]
+
+
+def test_run_pipelined_delegates_to_pipeline(extractor, transformer, loader):
+    pipeline = MagicMock()
+
+    AnimalETLManager(extractor, transformer, loader, streaming=True, pipeline=pipeline).run()
+
+    pipeline.run.assert_called_once_with(extractor, transformer, loader)
+    extractor.get_all_animals.assert_not_called()
+
+
+def test_run_closes_transformer_even_on_failure(extractor, transformer, loader):
+    loader.post_all_animals.side_effect = RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError):
+        AnimalETLManager(extractor, transformer, loader).run()
+
+    transformer.close.assert_called_once()
@@ -2,15 +2,14 @@ import pytest
 from unittest.mock import MagicMock, patch
 from requests.models import Response
 import json
+import time
 
 from etl.extract import AnimalExtractor
+from etl.records import AnimalRecord
+from etl.utils import (
+    CircuitOpenError, RetryBudgetExhaustedError, HttpSession, RateLimiter, RetryBudget, CircuitBreaker,
+)
 
-@pytest.fixture
-def mock_config():
-    cfg = MagicMock()
-    cfg.get_animals_url.return_value = "http://fakeapi.com/animals"
-    cfg.get_timeout.return_value = 5
-    return cfg
 
 @pytest.fixture
 def mock_retry_handler():
@@ -95,6 +94,54 @@ def test_get_all_animals_page_failure(animal_extractor, mock_retry_handler):
     animals = animal_extractor.get_all_animals()
     assert len(animals) == 1  # Page 2 skipped
 
+@pytest.mark.parametrize("error", [
+    CircuitOpenError("Circuit open for http://fakeapi.com/animals"),
+    RetryBudgetExhaustedError("Retry budget exhausted"),
+])
+def test_get_all_animals_aborts_instead_of_skipping_pages(animal_extractor, mock_retry_handler, error):
+    mock_retry_handler.request_with_retry.side_effect = [
+        make_response({"total_pages": 3, "items": [{"id": 1}]}),
+        make_response({"id": 1, "name": "Lion"}),
+        error,                                        # page 2: upstream given up on
+    ]
+    with pytest.raises(type(error)):
+        animal_extractor.get_all_animals()
+    assert mock_retry_handler.request_with_retry.call_count == 3  # page 3 never requested
+
+@pytest.fixture
+def reset_http_state():
+    def reset():
+        HttpSession.close()
+        RateLimiter.reset()
+        RetryBudget.reset()
+        CircuitBreaker.reset()
+    reset()
+    yield
+    reset()
+
+
+@patch("etl.utils.time.sleep")
+def test_one_missing_animal_does_not_stop_other_pages(mock_sleep, mock_config, reset_http_state):
+    pages = {page: [{"id": page * 10}, {"id": page * 10 + 1}] for page in (1, 2, 3)}
+
+    def request(method, url, params=None, **kwargs):
+        if params:
+            return make_response({"total_pages": 3, "items": pages[params["page"]]})
+        animal_id = int(url.rsplit("/", 1)[1])
+        return make_response({}, 404) if animal_id == 11 else make_response({"id": animal_id})
+
+    with patch("etl.extract.Logger.get_logger", return_value=MagicMock()):
+        extractor = AnimalExtractor(mock_config)
+    extractor.retry_handler.session = MagicMock()
+    extractor.retry_handler.session.request.side_effect = request
+
+    animals = extractor.get_all_animals()
+
+    # the rest of page 1 is skipped at its 404, which is neither retried nor opens the circuit
+    assert [a["id"] for a in animals] == [10, 20, 21, 30, 31]
+    assert extractor.retry_handler.session.request.call_count == 9  # 3 listings, 6 details
+    mock_sleep.assert_not_called()
+
 def test_get_all_animals_detail_failure(animal_extractor, mock_retry_handler):
     page1 = {"total_pages": 1, "items": [{"id": 1}]}
     mock_retry_handler.request_with_retry.side_effect = [
@@ -131,3 +178,186 @@ def test_get_all_animals_retry_returns_none(animal_extractor, mock_retry_handler
     mock_retry_handler.request_with_retry.return_value = None
     animals = animal_extractor.get_all_animals()
     assert animals == []
+
+
+def make_fake_request(pages):
+    """Helper to answer page and detail requests by URL, in any call order."""
+    def fake_request(method, url, params=None, timeout=None):
+        if params is not None:
+            return make_response(pages[params["page"]])
+        animal_id = int(url.rsplit("/", 1)[1])
+        time.sleep(0.01 * (animal_id % 3))  # finish out of order
+        return make_response({"id": animal_id, "name": f"Animal{animal_id}"})
+    return fake_request
+
+
+def test_get_all_animals_concurrent_preserves_order(animal_extractor, mock_retry_handler):
+    animal_extractor.max_concurrency = 4
+    pages = {
+        1: {"total_pages": 2, "items": [{"id": 1}, {"id": 2}, {"id": 3}]},
+        2: {"items": [{"id": 4}, {"id": 5}]},
+    }
+    mock_retry_handler.request_with_retry.side_effect = make_fake_request(pages)
+
+    animals = animal_extractor.get_all_animals()
+
+    assert [a["id"] for a in animals] == [1, 2, 3, 4, 5]
+    assert mock_retry_handler.request_with_retry.call_count == 7
+
+
+def test_get_all_animals_concurrent_detail_failure_skips_rest_of_page(animal_extractor, mock_retry_handler):
+    animal_extractor.max_concurrency = 4
+    pages = {
+        1: {"total_pages": 2, "items": [{"id": 1}, {"id": 2}]},
+        2: {"items": [{"id": 4}]},
+    }
+    fake_request = make_fake_request(pages)
+
+    def failing_request(method, url, params=None, timeout=None):
+        if url.endswith("/2"):
+            raise Exception("Detail fetch error")
+        return fake_request(method, url, params=params, timeout=timeout)
+
+    mock_retry_handler.request_with_retry.side_effect = failing_request
+
+    animals = animal_extractor.get_all_animals()
+
+    assert [a["id"] for a in animals] == [1, 4]
+
+
+def test_iter_animals_yields_before_next_page_is_fetched(animal_extractor, mock_retry_handler):
+    page1 = {"total_pages": 2, "items": [{"id": 1}]}
+    page2 = {"items": [{"id": 2}]}
+    mock_retry_handler.request_with_retry.side_effect = [
+        make_response(page1),
+        make_response({"id": 1, "name": "Lion"}),
+        make_response(page2),
+        make_response({"id": 2, "name": "Tiger"}),
+    ]
+    animals = animal_extractor.iter_animals()
+
+    assert next(animals)["name"] == "Lion"
+    assert mock_retry_handler.request_with_retry.call_count == 2
+    assert [a["name"] for a in animals] == ["Tiger"]
+
+
+def test_get_all_animals_logs_sampled_progress(animal_extractor, mock_retry_handler):
+    page1 = {"total_pages": 1, "items": [{"id": i} for i in range(1, 6)]}
+    mock_retry_handler.request_with_retry.side_effect = [make_response(page1)] + [
+        make_response({"id": i}) for i in range(1, 6)
+    ]
+
+    with patch("etl.extract.Logger.progress_every", 2):
+        animal_extractor.get_all_animals()
+
+    progress = [c for c in animal_extractor.logger.info.call_args_list if "so far" in c.args[0]]
+    assert [c.args[1] for c in progress] == [2, 4]
+    assert animal_extractor.logger.debug.call_count == 5  # per-animal lines are DEBUG
+
+
+def test_get_all_animals_uses_complete_page_items(animal_extractor, mock_retry_handler):
+    animal_extractor.required_fields = ["name", "friends", "born_at"]
+    page1 = {"total_pages": 1, "items": [
+        {"id": 1, "name": "Lion", "friends": "Tiger", "born_at": None},
+        {"id": 2, "name": "Tiger"},
+    ]}
+    mock_retry_handler.request_with_retry.side_effect = [
+        make_response(page1),
+        make_response({"id": 2, "name": "Tiger", "friends": "Lion", "born_at": None}),
+    ]
+
+    animals = animal_extractor.get_all_animals()
+
+    assert [a["id"] for a in animals] == [1, 2]
+    assert animals[1]["friends"] == "Lion"
+    assert mock_retry_handler.request_with_retry.call_count == 2
+
+
+def test_get_all_animals_bulk_detail(animal_extractor, mock_retry_handler):
+    animal_extractor.bulk_detail_param = "ids"
+    animal_extractor.bulk_detail_size = 2
+    page1 = {"total_pages": 1, "items": [{"id": 1}, {"id": 2}, {"id": 3}]}
+    bulk_calls = []
+
+    def fake_request(method, url, params=None, timeout=None):
+        if "page" in params:
+            return make_response(page1)
+        bulk_calls.append(params["ids"])
+        ids = [int(i) for i in params["ids"].split(",")]
+        # the upstream may return items in any order
+        return make_response({"items": [{"id": i, "name": f"Animal{i}"} for i in reversed(ids)]})
+
+    mock_retry_handler.request_with_retry.side_effect = fake_request
+
+    animals = animal_extractor.get_all_animals()
+
+    assert [a["name"] for a in animals] == ["Animal1", "Animal2", "Animal3"]
+    assert bulk_calls == ["1,2", "3"]
+
+
+def test_get_all_animals_bulk_detail_falls_back_for_missing_ids(animal_extractor, mock_retry_handler):
+    animal_extractor.bulk_detail_param = "ids"
+    animal_extractor.bulk_detail_size = 50
+    page1 = {"total_pages": 1, "items": [{"id": 1}, {"id": 2}]}
+    mock_retry_handler.request_with_retry.side_effect = [
+        make_response(page1),
+        make_response([{"id": 1, "name": "Lion"}]),
+        make_response({"id": 2, "name": "Tiger"}),
+    ]
+
+    animals = animal_extractor.get_all_animals()
+
+    assert [a["name"] for a in animals] == ["Lion", "Tiger"]
+    assert mock_retry_handler.request_with_retry.call_args.args[1] == "http://fakeapi.com/animals/2"
+
+
+def test_get_all_animals_prefetches_all_remaining_pages(animal_extractor, mock_retry_handler):
+    animal_extractor.max_concurrency = 4
+    animal_extractor.page_prefetch = 0
+    pages = {p: {"total_pages": 4, "items": [{"id": p}]} for p in range(1, 5)}
+    fake_request = make_fake_request(pages)
+    requested_pages = []
+
+    def recording_request(method, url, params=None, timeout=None):
+        if params is not None:
+            requested_pages.append(params["page"])
+        return fake_request(method, url, params=params, timeout=timeout)
+
+    mock_retry_handler.request_with_retry.side_effect = recording_request
+
+    animals = animal_extractor.get_all_animals()
+
+    assert [a["id"] for a in animals] == [1, 2, 3, 4]
+    assert sorted(requested_pages) == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("shard_index, expected", [(0, [1, 3, 5]), (1, [2, 4])])
+def test_get_all_animals_shard(mock_config, mock_retry_handler, shard_index, expected):
+    with patch("etl.extract.RetryHandler", return_value=mock_retry_handler), \
+         patch("etl.extract.Logger.get_logger"):
+        extractor = AnimalExtractor(mock_config, shard=(shard_index, 2))
+    pages = {p: {"total_pages": 5, "items": [{"id": p}]} for p in range(1, 6)}
+    mock_retry_handler.request_with_retry.side_effect = make_fake_request(pages)
+
+    animals = extractor.get_all_animals()
+
+    assert [a["id"] for a in animals] == expected
+
+
+def test_invalid_shard(mock_config):
+    with pytest.raises(ValueError):
+        AnimalExtractor(mock_config, shard=(2, 2))
+
+
+def test_get_all_animals_compact_records(animal_extractor, mock_retry_handler):
+    animal_extractor.compact = True
+    page1 = {"total_pages": 1, "items": [{"id": 1}]}
+    mock_retry_handler.request_with_retry.side_effect = [
+        make_response(page1),
+        make_response({"id": 1, "name": "Lion", "friends": "Tiger"}),
+    ]
+
+    animals = animal_extractor.get_all_animals()
+
+    assert isinstance(animals[0], AnimalRecord)
+    assert animals[0].to_dict() == {"id": 1, "name": "Lion", "friends": "Tiger"}
@@ -1,15 +1,14 @@
+import threading
+import time
 import pytest
 from unittest.mock import MagicMock, patch
 from etl.load import AnimalLoader
+from tests.helpers import make_mock_config
 
 
 @pytest.fixture
 def mock_config():
-    cfg = MagicMock()
-    cfg.get_home_url.return_value = "http://fake-url.com"
-    cfg.get_batch_size.return_value = 2
-    cfg.get_timeout.return_value = 5
-    return cfg
+    return make_mock_config(batch_size=2)
 
 
 @pytest.fixture
@@ -143,3 +142,84 @@ def test_post_animals_batch_respects_timeout(loader, mock_retry_handler):
         json=batch,
         timeout=99
     )
+
+
+def test_post_all_animals_consumes_generator(loader, mock_retry_handler):
+    loader.batch_size = 2
+    produced = []
+
+    def animals():
+        for i in range(3):
+            produced.append(i)
+            yield {"name": f"Animal{i}"}
+
+    posted_after = []
+    mock_retry_handler.request_with_retry.side_effect = lambda *a, **kw: posted_after.append(len(produced))
+
+    loader.post_all_animals(animals())
+
+    # first batch is posted before the generator is exhausted
+    assert posted_after == [2, 3]
+
+
+def test_post_all_animals_returns_batch_results(loader, mock_retry_handler):
+    loader.batch_size = 2
+    results = loader.post_all_animals([{"name": "A"}, {"name": "B"}, {"name": "C"}])
+
+    assert [(r.index, r.size, r.error) for r in results] == [(0, 2, None), (1, 1, None)]
+
+
+def test_post_all_animals_concurrent_limits_in_flight(loader, mock_retry_handler):
+    loader.batch_size = 1
+    loader.max_in_flight = 3
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def slow_post(*args, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+
+    mock_retry_handler.request_with_retry.side_effect = slow_post
+
+    results = loader.post_all_animals([{"name": str(i)} for i in range(10)])
+
+    assert mock_retry_handler.request_with_retry.call_count == 10
+    assert peak[0] == 3
+    assert [r.index for r in results] == list(range(10))
+
+
+def test_post_all_animals_unordered_reports_every_batch(loader, mock_retry_handler):
+    loader.batch_size = 1
+    loader.max_in_flight = 4
+    loader.ordered = False
+
+    def post(method, url, json, timeout):
+        time.sleep(0.01 * (3 - int(json[0]["name"]) % 4))
+
+    mock_retry_handler.request_with_retry.side_effect = post
+
+    results = loader.post_all_animals([{"name": str(i)} for i in range(8)])
+
+    assert sorted(r.index for r in results) == list(range(8))
+
+
+def test_post_all_animals_concurrent_raises_first_failure(loader, mock_retry_handler):
+    loader.batch_size = 1
+    loader.max_in_flight = 2
+
+    def post(method, url, json, timeout):
+        if json[0]["name"] == "B":
+            raise Exception("Boom")
+
+    mock_retry_handler.request_with_retry.side_effect = post
+
+    with pytest.raises(Exception, match="Boom"):
+        loader.post_all_animals([{"name": n} for n in "ABCDEFGH"])
+
+    # posting stops shortly after the failure instead of sending every batch
+    assert mock_retry_handler.request_with_retry.call_count < 8
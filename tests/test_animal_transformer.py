@@ -2,7 +2,8 @@ import pytest
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timezone
 
-from etl.transform import AnimalTransformer
+from etl.transform import AnimalTransformer, parse_born_at
+from etl.utils import Logger
 
 @pytest.fixture
 def transformer():
@@ -89,3 +90,121 @@ def test_transform_with_missing_born_at_key(transformer):
     }
     result = transformer.transform(animal)
     assert result["born_at"] is None
+
+def test_transform_all_is_lazy(transformer):
+    animals = iter([{"id": 9, "friends": "Tom", "born_at": None}])
+    result = transformer.transform_all(animals)
+
+    assert not isinstance(result, list)
+    assert list(result) == [{"id": 9, "friends": ["Tom"], "born_at": None}]
+
+@pytest.mark.parametrize("born_at", [
+    "2020-05-01T15:30:00",
+    "2022-01-01",
+    "2021-06-15T10:00:00Z",
+    "2020-05-01 15:30",
+    "2020-05-01T15:30:00.5",
+    "2020-05-01T15:30:00.123456+05:30",
+    "2020-05-01T15:30:00-08:00",
+    "May 1 2020 3:30 PM",
+    "2020/05/01 15:30:00 UTC",
+])
+def test_parse_born_at_matches_dateutil(born_at):
+    from dateutil import parser
+    expected = parser.parse(born_at).astimezone(timezone.utc).isoformat()
+    assert parse_born_at(born_at) == expected
+
+def test_parse_born_at_memoises_repeated_values():
+    parse_born_at.cache_clear()
+    parse_born_at("2020-05-01T15:30:00Z")
+    parse_born_at("2020-05-01T15:30:00Z")
+    assert parse_born_at.cache_info().hits == 1
+
+@patch("dateutil.parser.parse")
+def test_parse_born_at_iso_skips_dateutil(mock_parse):
+    parse_born_at.cache_clear()
+    assert parse_born_at("2021-06-15T10:00:00Z") == "2021-06-15T10:00:00+00:00"
+    mock_parse.assert_not_called()
+
+def test_transform_batch_matches_per_record(transformer):
+    records = [
+        {"id": 1, "friends": "Tom, Jerry , Spike", "born_at": "2020-05-01T15:30:00"},
+        {"id": 2, "friends": "", "born_at": "2020-05-01T15:30:00"},
+        {"id": 3, "born_at": "2021-06-15T10:00:00Z"},
+        {"id": 4, "friends": "   Tom  ,   , Jerry , ", "born_at": None},
+        {"id": 5, "friends": "Max", "born_at": 12345},
+        {"id": 6, "friends": "Max", "born_at": "invalid-date"},
+        {"id": 7, "friends": "Max"},
+    ]
+    import copy
+    expected = [transformer.transform(r) for r in copy.deepcopy(records)]
+
+    assert transformer.transform_batch(records) == expected
+
+@patch("etl.transform.parse_born_at")
+def test_transform_batch_parses_each_value_once(mock_parse, transformer):
+    mock_parse.return_value = "2020-05-01T15:30:00+00:00"
+    records = [{"id": i, "friends": "", "born_at": "2020-05-01T15:30:00Z"} for i in range(5)]
+
+    result = transformer.transform_batch(records)
+
+    mock_parse.assert_called_once_with("2020-05-01T15:30:00Z")
+    assert all(r["born_at"] == "2020-05-01T15:30:00+00:00" for r in result)
+
+@patch("etl.transform.Logger.get_logger")
+def test_transform_batch_logs_each_unparseable_record(mock_logger):
+    mock_log_instance = MagicMock()
+    mock_logger.return_value = mock_log_instance
+    transformer = AnimalTransformer()
+
+    result = transformer.transform_batch([
+        {"id": 1, "friends": "", "born_at": "invalid-date"},
+        {"id": 2, "friends": "", "born_at": "invalid-date"},
+    ])
+
+    assert [r["born_at"] for r in result] == [None, None]
+    assert mock_log_instance.info.call_count == 2
+
+def test_transform_batch_process_pool_matches_in_process():
+    records = [
+        {"id": i, "friends": f"Tom, Friend{i}", "born_at": f"2020-05-{i % 28 + 1:02d}T15:30:00Z"}
+        for i in range(25)
+    ]
+    records.append({"id": 99, "friends": "", "born_at": "invalid-date"})
+    import copy
+    expected = AnimalTransformer().transform_batch(copy.deepcopy(records))
+
+    transformer = AnimalTransformer(processes=2, chunk_size=4)
+    try:
+        result = transformer.transform_batch(records)
+    finally:
+        transformer.close()
+
+    assert result == expected
+
+def test_transform_batch_process_pool_with_concurrent_logging():
+    import threading
+    records = [{"id": i, "friends": "Tom", "born_at": "invalid-date"} for i in range(20)]
+    stop = threading.Event()
+
+    def log_continuously():
+        logger = Logger.get_logger()
+        while not stop.is_set():
+            logger.debug("background thread still logging")
+
+    thread = threading.Thread(target=log_continuously, daemon=True)
+    thread.start()
+    transformer = AnimalTransformer(processes=2, chunk_size=4)
+    try:
+        for _ in range(3):
+            result = transformer.transform_batch([dict(r) for r in records])
+            assert [r["born_at"] for r in result] == [None] * 20
+        # the pool is created once and reused across batches
+        executor = transformer._executor
+        transformer.transform_batch([dict(r) for r in records])
+        assert transformer._executor is executor
+    finally:
+        stop.set()
+        thread.join()
+        transformer.close()
+    assert transformer._executor is None
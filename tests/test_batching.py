@@ -0,0 +1,111 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from etl.batching import AdaptiveBatcher
+from etl.load import AnimalLoader
+from etl.utils import PayloadTooLargeError
+from tests.helpers import make_mock_config
+
+
+@pytest.fixture
+def mock_config():
+    return make_mock_config(
+        batch_size=4, adaptive_batching=True, min_batch_size=2, max_batch_size=8,
+        max_batch_bytes=10_000, target_batch_latency_seconds=1.0,
+    )
+
+
+@pytest.fixture
+def batcher(mock_config):
+    return AdaptiveBatcher(mock_config)
+
+
+def test_batches_capped_by_count(batcher):
+    batches = list(batcher.iter_batches({"id": i} for i in range(10)))
+    assert [len(b) for b in batches] == [4, 4, 2]
+
+
+def test_batches_capped_by_bytes(batcher):
+    batcher.max_bytes = 250
+    animals = [{"id": i, "name": "x" * 50} for i in range(6)]
+
+    batches = list(batcher.iter_batches(animals))
+
+    assert all(len(json.dumps(b).encode("utf-8")) <= 250 for b in batches)
+    assert [a for b in batches for a in b] == animals
+
+
+def test_oversized_record_is_sent_alone(batcher):
+    batcher.max_bytes = 20
+    animals = [{"id": 1, "name": "x" * 100}, {"id": 2}]
+    assert list(batcher.iter_batches(animals)) == [[animals[0]], [animals[1]]]
+
+
+def test_aimd_grows_additively_and_shrinks_multiplicatively(batcher):
+    batcher.record(0.1, True)
+    assert batcher.batch_size == 6
+    batcher.record(0.1, True)
+    batcher.record(0.1, True)
+    assert batcher.batch_size == 8  # capped at max_batch_size
+    batcher.record(0.1, False)
+    assert batcher.batch_size == 4
+    batcher.record(5.0, True)  # slower than target latency
+    assert batcher.batch_size == 2
+    batcher.record(0.1, False)
+    assert batcher.batch_size == 2  # floored at min_batch_size
+
+
+def test_record_too_large_keeps_batches_below_half(batcher):
+    batcher.batch_size = 8
+    batcher.record_too_large(6)
+    assert batcher.batch_size == 3
+    batcher.record_too_large(2)
+    assert batcher.batch_size == 2  # floored at min_batch_size
+
+
+def test_size_is_estimated_from_a_sample(batcher):
+    with patch("etl.batching.json.dumps", wraps=json.dumps) as dumps:
+        list(batcher.iter_batches({"id": i} for i in range(40)))
+    assert dumps.call_count == 3  # records 0, 16 and 32
+
+
+def test_loader_uses_adaptive_batches(mock_config):
+    retry_handler = MagicMock()
+    with patch("etl.load.RetryHandler", return_value=retry_handler), \
+         patch("etl.load.Logger.get_logger", return_value=MagicMock()):
+        loader = AnimalLoader(mock_config)
+
+    loader.post_all_animals([{"id": i} for i in range(20)])
+
+    sizes = [len(call.kwargs["json"]) for call in retry_handler.request_with_retry.call_args_list]
+    assert sizes == [4, 6, 8, 2]
+
+
+def test_loader_splits_batch_rejected_as_too_large(mock_config):
+    def post(method, url, **kwargs):
+        if len(kwargs["json"]) > 2:
+            raise PayloadTooLargeError("Payload too large")
+
+    retry_handler = MagicMock()
+    retry_handler.request_with_retry.side_effect = post
+    with patch("etl.load.RetryHandler", return_value=retry_handler), \
+         patch("etl.load.Logger.get_logger", return_value=MagicMock()):
+        loader = AnimalLoader(mock_config)
+
+    loader.post_all_animals([{"id": i} for i in range(4)])
+
+    sizes = [len(call.kwargs["json"]) for call in retry_handler.request_with_retry.call_args_list]
+    assert sizes == [4, 2, 2]
+    assert loader.batcher.batch_size == 4  # cut to 2, then grown by the successful batch
+
+
+def test_loader_raises_when_single_record_is_too_large(mock_config):
+    retry_handler = MagicMock()
+    retry_handler.request_with_retry.side_effect = PayloadTooLargeError("Payload too large")
+    with patch("etl.load.RetryHandler", return_value=retry_handler), \
+         patch("etl.load.Logger.get_logger", return_value=MagicMock()):
+        loader = AnimalLoader(mock_config)
+
+    with pytest.raises(PayloadTooLargeError):
+        loader.post_animals_batch([{"id": 1}])
@@ -0,0 +1,55 @@
+import os
+
+import requests
+
+from benchmarks.import_time import measure, slowest_imports
+from benchmarks.mock_server import MockAnimalsAPI
+from benchmarks.run_benchmarks import run, percentile
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.yaml")
+
+
+def test_mock_server_serves_pages_and_details():
+    with MockAnimalsAPI(animals=25, page_size=10) as server:
+        page = requests.get(f"{server.base_url}/animals", params={"page": 3}).json()
+        detail = requests.get(f"{server.base_url}/animals/7").json()
+        posted = requests.post(f"{server.base_url}/home", json=[detail, detail])
+
+    assert page["total_pages"] == 3
+    assert [item["id"] for item in page["items"]] == [21, 22, 23, 24, 25]
+    assert detail["id"] == 7 and "friends" in detail
+    assert posted.status_code == 200
+    assert server.received == 2
+
+
+def test_mock_server_serves_bulk_details():
+    with MockAnimalsAPI(animals=25, page_size=10) as server:
+        details = requests.get(f"{server.base_url}/animals", params={"ids": "3,30,5"}).json()
+
+    assert [d["id"] for d in details] == [3, 5]
+
+
+def test_mock_server_injects_errors():
+    with MockAnimalsAPI(animals=5, error_rate=1.0) as server:
+        assert requests.get(f"{server.base_url}/animals/1").status_code == 503
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(101)), 99) == 99
+
+
+def test_run_reports_every_stage():
+    results = run(animals=30, page_size=10, base_config=CONFIG, trace_memory=False,
+                  overrides={"max_concurrency": 2, "pipelined": False, "transform_processes": 1})
+
+    rows = {r.stage: r.as_dict() for r in results}
+    assert list(rows) == ["extract", "transform", "load", "full"]
+    assert all(row["records"] == 30 for row in rows.values())
+    assert rows["extract"]["p99_ms"] >= rows["extract"]["p50_ms"] > 0
+
+
+def test_import_time_reports_stage_modules():
+    assert measure("help", repeat=1) >= 0.0
+    assert "etl.extract" in [name for _, name in slowest_imports("run", top=20)]
@@ -0,0 +1,123 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from requests.models import Response
+
+from etl.cache import ResponseCache
+from etl.extract import AnimalExtractor
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "http_cache.db"), ttl_seconds=60, max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def mock_retry_handler():
+    return MagicMock()
+
+
+@pytest.fixture
+def extractor(mock_config, cache, mock_retry_handler):
+    with patch("etl.extract.RetryHandler", return_value=mock_retry_handler), \
+         patch("etl.extract.Logger.get_logger", return_value=MagicMock()):
+        return AnimalExtractor(mock_config, cache=cache)
+
+
+def make_response(json_data, status_code=200, headers=None):
+    resp = Response()
+    resp.status_code = status_code
+    resp._content = json.dumps(json_data).encode("utf-8") if json_data is not None else b""
+    resp.headers.update(headers or {})
+    return resp
+
+
+def test_cache_roundtrip_and_freshness(cache):
+    assert cache.get("http://x/1") is None
+    cache.put("http://x/1", b'{"id": 1}', etag='"abc"')
+
+    entry = cache.get("http://x/1")
+    assert entry.body == b'{"id": 1}'
+    assert entry.fresh
+    assert cache.validators(entry) == {"If-None-Match": '"abc"'}
+
+    cache.ttl_seconds = 0
+    assert not cache.get("http://x/1").fresh
+
+
+def test_cache_evicts_least_recently_used(cache):
+    cache.put("http://x/1", b"a" * 400)
+    cache.put("http://x/2", b"b" * 400)
+    cache.get("http://x/1")  # 2 is now least recently used
+    cache.put("http://x/3", b"c" * 400)
+
+    assert cache.get("http://x/2") is None
+    assert cache.get("http://x/1") is not None
+    assert cache.get("http://x/3") is not None
+
+
+def test_cache_evicts_in_batches(cache):
+    for i in range(5):
+        cache.put(f"http://x/{i}", b"a" * 200)
+    with patch("etl.cache._EVICT_BATCH", 2):
+        cache.put("http://x/big", b"b" * 900)
+
+    assert cache._total_bytes == 900
+    assert all(cache.get(f"http://x/{i}") is None for i in range(5))
+
+
+def test_cache_hits_are_written_back_lazily(tmp_path):
+    path = str(tmp_path / "http_cache.db")
+    cache = ResponseCache(path)
+    cache.put("http://x/1", b"a")
+    changes = cache._conn.total_changes
+
+    cache.get("http://x/1")
+    assert cache._conn.total_changes == changes  # no write per hit
+    accessed = cache._accessed["http://x/1"]
+    cache.close()
+
+    reopened = ResponseCache(path)
+    row = reopened._conn.execute("SELECT last_access FROM responses").fetchone()
+    assert row[0] == accessed
+    reopened.close()
+
+
+def test_detail_served_from_fresh_cache(extractor, mock_retry_handler):
+    mock_retry_handler.request_with_retry.return_value = make_response({"id": 1, "name": "Lion"})
+
+    first = extractor.get_animal_detail(1)
+    second = extractor.get_animal_detail(1)
+
+    assert first == second == {"id": 1, "name": "Lion"}
+    mock_retry_handler.request_with_retry.assert_called_once_with(
+        "GET", "http://fakeapi.com/animals/1", headers={}, timeout=5
+    )
+
+
+def test_stale_detail_is_revalidated(extractor, cache, mock_retry_handler):
+    mock_retry_handler.request_with_retry.side_effect = [
+        make_response({"id": 1, "name": "Lion"}, headers={"ETag": '"v1"'}),
+        make_response(None, status_code=304),
+    ]
+    extractor.get_animal_detail(1)
+    cache.ttl_seconds = 0
+
+    animal = extractor.get_animal_detail(1)
+
+    assert animal == {"id": 1, "name": "Lion"}
+    second_call = mock_retry_handler.request_with_retry.call_args_list[1]
+    assert second_call.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+def test_invalid_json_is_not_cached(extractor, cache, mock_retry_handler):
+    bad_resp = Response()
+    bad_resp.status_code = 200
+    bad_resp._content = b"not-json"
+    mock_retry_handler.request_with_retry.return_value = bad_resp
+
+    with pytest.raises(Exception):
+        extractor.get_animal_detail(1)
+    assert cache.get("http://fakeapi.com/animals/1") is None
@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from etl.checkpoint import CheckpointStore
+from etl.extract import AnimalExtractor
+from etl.load import AnimalLoader
+from etl.transform import AnimalTransformer
+from tests.test_animal_extractor import make_response
+from tests.helpers import make_mock_config
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "state" / "checkpoint.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def mock_config():
+    return make_mock_config(batch_size=2)
+
+
+def make_component(cls, cfg, store, retry_handler):
+    module = cls.__module__
+    with patch(f"{module}.RetryHandler", return_value=retry_handler), \
+         patch(f"{module}.Logger.get_logger", return_value=MagicMock()):
+        return cls(cfg, checkpoint=store)
+
+
+def test_store_roundtrips_pages(store):
+    assert store.load_page(1) is None
+    store.save_page(1, 3, [{"id": 1}])
+    assert store.has_page(1)
+    assert store.load_page(1) == (3, [{"id": 1}])
+
+
+def test_store_persists_across_instances(tmp_path):
+    path = str(tmp_path / "checkpoint.db")
+    first = CheckpointStore(path)
+    first.mark_batch_done([{"id": 1}])
+    first.close()
+
+    second = CheckpointStore(path)
+    assert second.is_batch_done([{"id": 1}])
+    assert not second.is_batch_done([{"id": 2}])
+    second.clear()
+    assert not second.is_batch_done([{"id": 1}])
+    second.close()
+
+
+def test_extractor_resumes_from_completed_pages(mock_config, store):
+    store.save_page(1, 2, [{"id": 1, "name": "Lion"}])
+    retry_handler = MagicMock()
+    retry_handler.request_with_retry.side_effect = [
+        make_response({"total_pages": 2, "items": [{"id": 2}]}),
+        make_response({"id": 2, "name": "Tiger"}),
+    ]
+    extractor = make_component(AnimalExtractor, mock_config, store, retry_handler)
+
+    animals = extractor.get_all_animals()
+
+    assert [a["name"] for a in animals] == ["Lion", "Tiger"]
+    first_call = retry_handler.request_with_retry.call_args_list[0]
+    assert first_call.kwargs["params"] == {"page": 2}
+    assert store.load_page(2) == (2, [{"id": 2, "name": "Tiger"}])
+
+
+def test_extractor_does_not_checkpoint_failed_page(mock_config, store):
+    retry_handler = MagicMock()
+    retry_handler.request_with_retry.side_effect = [
+        make_response({"total_pages": 1, "items": [{"id": 1}]}),
+        Exception("Detail fetch error"),
+    ]
+    extractor = make_component(AnimalExtractor, mock_config, store, retry_handler)
+
+    assert extractor.get_all_animals() == []
+    assert not store.has_page(1)
+
+
+def test_streaming_resume_replays_untransformed_records(mock_config, store):
+    lion = {"id": 1, "name": "Lion", "friends": "Tiger,Bear", "born_at": "2020-01-01T00:00:00+00:00"}
+    retry_handler = MagicMock()
+    retry_handler.request_with_retry.side_effect = [
+        make_response({"total_pages": 1, "items": [{"id": 1}]}),
+        make_response(lion),
+    ]
+    extractor = make_component(AnimalExtractor, mock_config, store, retry_handler)
+    transformer = AnimalTransformer()
+
+    # streaming mode transforms each record in place as soon as it is yielded
+    first = list(transformer.transform_all(extractor.iter_animals()))
+    assert store.load_page(1) == (1, [lion])
+
+    resumed = make_component(AnimalExtractor, mock_config, store, MagicMock())
+    assert list(transformer.transform_all(resumed.iter_animals())) == first
+    assert first[0]["friends"] == ["Tiger", "Bear"]
+
+
+def test_loader_skips_acknowledged_batches(mock_config, store):
+    animals = [{"id": i} for i in range(5)]
+    store.mark_batch_done([{"id": 0}, {"id": 1}])
+    retry_handler = MagicMock()
+    loader = make_component(AnimalLoader, mock_config, store, retry_handler)
+
+    results = loader.post_all_animals(animals)
+
+    posted = [call.kwargs["json"] for call in retry_handler.request_with_retry.call_args_list]
+    assert posted == [[{"id": 2}, {"id": 3}], [{"id": 4}]]
+    assert [r.index for r in results] == [1, 2]
+    assert store.is_batch_done([{"id": 4}])
+
+
+def test_loader_does_not_acknowledge_failed_batch(mock_config, store):
+    retry_handler = MagicMock()
+    retry_handler.request_with_retry.side_effect = Exception("Boom")
+    loader = make_component(AnimalLoader, mock_config, store, retry_handler)
+
+    with pytest.raises(Exception, match="Boom"):
+        loader.post_all_animals([{"id": 1}])
+    assert not store.is_batch_done([{"id": 1}])
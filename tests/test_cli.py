@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import pytest
+import yaml
+
+from benchmarks.mock_server import MockAnimalsAPI
+from etl.cli import build_parser, main
+from etl.utils import CircuitBreaker, HttpSession, RateLimiter, RetryBudget
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+
+
+@pytest.fixture
+def server():
+    with MockAnimalsAPI(animals=12, page_size=5) as server:
+        yield server
+    HttpSession.close()
+    RateLimiter.reset()
+    RetryBudget.reset()
+    CircuitBreaker.reset()
+
+
+def write_config(tmp_path, server):
+    with open(os.path.join(ROOT, "config.yaml")) as f:
+        settings = yaml.safe_load(f)
+    settings.update({
+        "animals_url": f"{server.base_url}/animals",
+        "home_url": f"{server.base_url}/home",
+        "checkpoint_file": str(tmp_path / "checkpoint.db"),
+        "staging_dir": str(tmp_path / "staging"),
+        "raw_staging_dir": str(tmp_path / "raw"),
+        "metrics_json_file": "",
+        "cache_enabled": False,
+        "incremental": False,
+    })
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(settings))
+    return str(path)
+
+
+def test_command_defaults_to_run():
+    assert build_parser().parse_args([]).command == "run"
+    assert build_parser().parse_args(["load", "--resume"]).resume
+
+
+def test_stage_commands_match_full_run(tmp_path, server):
+    config = write_config(tmp_path, server)
+
+    main(["extract", "--config", config])
+    main(["transform", "--config", config])
+    assert server.received == 0
+    main(["load", "--config", config])
+
+    assert server.received == 12
+    main(["run", "--config", config])
+    assert server.received == 24
+
+
+@pytest.mark.parametrize("module, absent", [
+    # --help and argument errors must not pay for the stage modules
+    ("etl.cli", ("requests", "yaml", "dateutil")),
+    # optional or rarely needed dependencies are imported on first use
+    ("etl.transform", ("dateutil",)),
+    ("etl.staging", ("pyarrow", "asyncio")),
+])
+def test_lazy_imports(module, absent):
+    code = f"import sys, {module}; print(sorted(m for m in {absent!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
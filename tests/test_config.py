@@ -0,0 +1,115 @@
+import os
+
+import pytest
+import yaml
+
+from etl.cli import PROFILE_NAMES
+from etl.config import PROFILES, SCHEMA, Config, ConfigError, parse_overrides
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+URLS = {"animals_url": "http://api/animals", "home_url": "http://api/home"}
+
+
+def write_config(tmp_path, **values):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({**URLS, **values}))
+    return str(path)
+
+
+def test_defaults_fill_missing_keys(tmp_path):
+    cfg = Config(write_config(tmp_path), environ={})
+
+    assert cfg.get_batch_size() == 100
+    assert cfg.get_timeout() == 30.0
+    assert cfg.get_request_compression() == "none"
+    assert set(cfg.as_dict()) == set(SCHEMA)
+
+
+def test_precedence_file_profile_env_overrides(tmp_path):
+    path = write_config(tmp_path, max_concurrency=3, batch_size=50, pool_maxsize=5, queue_size=7)
+    environ = {"ETL_PROFILE": "throughput", "ETL_BATCH_SIZE": "250", "ETL_POOL_MAXSIZE": "9"}
+
+    cfg = Config(path, overrides={"pool_maxsize": 11}, environ=environ)
+
+    assert cfg.profile == "throughput"
+    assert cfg.get_queue_size() == 7                      # file
+    assert cfg.get_max_concurrency() == 32                # profile over file
+    assert cfg.get_batch_size() == 250                    # env over profile
+    assert cfg.get_pool_maxsize() == 11                   # override over env
+
+
+def test_profile_argument_wins_over_file_and_env(tmp_path):
+    path = write_config(tmp_path, profile="throughput")
+
+    cfg = Config(path, profile="gentle-upstream", environ={"ETL_PROFILE": "low-memory"})
+
+    assert cfg.profile == "gentle-upstream"
+    assert cfg.get_animals_rate_limit() == 5.0
+
+
+def test_invalid_values_are_reported_together(tmp_path):
+    path = write_config(tmp_path, batch_size=0, streaming="yes", json_backend="pickle", typo_key=1)
+
+    with pytest.raises(ConfigError) as exc:
+        Config(path, environ={})
+
+    message = str(exc.value)
+    for fragment in ("batch_size must be >= 1", "streaming must be bool", "json_backend must be one of",
+                     "unknown setting 'typo_key'"):
+        assert fragment in message
+
+
+def test_blank_values_switch_optional_settings_off(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(URLS) + "metrics_json_file:\n")
+
+    cfg = Config(str(path), environ={"ETL_METRICS_PROMETHEUS_FILE": ""})
+
+    assert cfg.get_metrics_json_file() == ""
+    assert cfg.get_metrics_prometheus_file() == ""
+    with pytest.raises(ConfigError, match="checkpoint_file must not be empty"):
+        Config(str(path), environ={"ETL_CHECKPOINT_FILE": ""})
+
+
+def test_timeout_must_be_positive(tmp_path):
+    with pytest.raises(ConfigError, match="timeout_seconds must be > 0"):
+        Config(write_config(tmp_path, timeout_seconds=0), environ={})
+
+
+def test_cross_field_checks(tmp_path):
+    path = write_config(tmp_path, min_batch_size=50, max_batch_size=10, shard_index=2, shard_count=2)
+
+    with pytest.raises(ConfigError, match="min_batch_size.*\n.*shard_index"):
+        Config(path, environ={})
+
+
+def test_missing_url_and_unknown_profile(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("batch_size: 10\n")
+    with pytest.raises(ConfigError, match="animals_url is required"):
+        Config(str(path), environ={})
+    with pytest.raises(ConfigError, match="Unknown profile"):
+        Config(write_config(tmp_path), profile="turbo", environ={})
+
+
+def test_log_levels_are_normalised(tmp_path):
+    assert Config(write_config(tmp_path, log_level="debug"), environ={}).get_log_level() == "DEBUG"
+
+
+def test_parse_overrides():
+    assert parse_overrides(["max_concurrency=16", "http2=true", "detail_required_fields=[name, born_at]"]) == {
+        "max_concurrency": 16, "http2": True, "detail_required_fields": ["name", "born_at"],
+    }
+    with pytest.raises(ConfigError):
+        parse_overrides(["max_concurrency"])
+
+
+@pytest.mark.parametrize("profile", [None, *PROFILES])
+def test_shipped_config_is_valid_with_every_profile(profile):
+    Config(os.path.join(ROOT, "config.yaml"), profile=profile, environ={})
+
+
+def test_profiles_only_set_known_keys():
+    assert set(PROFILE_NAMES) == set(PROFILES)
+    for values in PROFILES.values():
+        assert set(values) <= set(SCHEMA)
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from etl.incremental import HashIndex
+from etl.load import AnimalLoader
+from tests.helpers import make_mock_config
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = HashIndex(str(tmp_path / "hash_index.db"))
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def mock_config():
+    return make_mock_config(batch_size=2)
+
+
+@pytest.fixture
+def mock_retry_handler():
+    return MagicMock()
+
+
+@pytest.fixture
+def loader(mock_config, mock_retry_handler, index):
+    with patch("etl.load.RetryHandler", return_value=mock_retry_handler), \
+         patch("etl.load.Logger.get_logger", return_value=MagicMock()):
+        return AnimalLoader(mock_config, hash_index=index)
+
+
+def test_index_detects_new_and_changed(index):
+    animal = {"id": 1, "name": "Lion", "friends": ["Tom"]}
+    assert index.is_changed(animal)
+
+    index.update([animal])
+    assert not index.is_changed({"friends": ["Tom"], "name": "Lion", "id": 1})
+    assert index.is_changed({"id": 1, "name": "Lion", "friends": ["Tom", "Jerry"]})
+    assert index.is_changed({"name": "No id"})
+
+
+def test_index_persists_across_instances(tmp_path):
+    path = str(tmp_path / "hash_index.db")
+    first = HashIndex(path)
+    first.update([{"id": 1, "name": "Lion"}])
+    first.close()
+
+    second = HashIndex(path)
+    assert len(second) == 1
+    assert not second.is_changed({"id": 1, "name": "Lion"})
+    second.close()
+
+
+def test_loader_posts_only_delta(loader, mock_retry_handler, index):
+    index.update([{"id": 1, "name": "Lion"}, {"id": 2, "name": "Tiger"}])
+    animals = [
+        {"id": 1, "name": "Lion"},
+        {"id": 2, "name": "Tiger (renamed)"},
+        {"id": 3, "name": "Bear"},
+    ]
+
+    loader.post_all_animals(animals)
+
+    posted = [call.kwargs["json"] for call in mock_retry_handler.request_with_retry.call_args_list]
+    assert posted == [[{"id": 2, "name": "Tiger (renamed)"}, {"id": 3, "name": "Bear"}]]
+    assert not index.is_changed({"id": 3, "name": "Bear"})
+
+
+def test_loader_keeps_failed_batch_pending(loader, mock_retry_handler, index):
+    mock_retry_handler.request_with_retry.side_effect = Exception("Boom")
+
+    with pytest.raises(Exception, match="Boom"):
+        loader.post_all_animals([{"id": 1, "name": "Lion"}])
+
+    assert index.is_changed({"id": 1, "name": "Lion"})
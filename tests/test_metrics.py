@@ -0,0 +1,90 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from etl.animal_etl_manager import AnimalETLManager
+from etl.metrics import Metrics, JsonSummarySink, PrometheusTextFileSink, CallbackSink
+
+
+@pytest.fixture
+def metrics():
+    return Metrics()
+
+
+def find(entries, name, **labels):
+    labels = {k: str(v) for k, v in labels.items()}
+    return next(e for e in entries if e["name"] == name and e["labels"] == labels)
+
+
+def test_counters_and_gauges(metrics):
+    metrics.inc("records_total", labels={"stage": "extract"})
+    metrics.inc("records_total", 4, {"stage": "extract"})
+    metrics.inc("records_total", labels={"stage": "load"})
+    metrics.set_gauge("in_flight", 3)
+
+    snapshot = metrics.snapshot()
+
+    assert find(snapshot["counters"], "records_total", stage="extract")["value"] == 5
+    assert find(snapshot["counters"], "records_total", stage="load")["value"] == 1
+    assert find(snapshot["gauges"], "in_flight")["value"] == 3
+
+
+def test_histogram_buckets_are_cumulative(metrics):
+    for value in (0.001, 0.02, 0.02, 3.0):
+        metrics.observe("http_request_seconds", value, buckets=(0.01, 0.1, 1.0))
+
+    histogram = find(metrics.snapshot()["histograms"], "http_request_seconds")
+
+    assert histogram["count"] == 4
+    assert histogram["max"] == 3.0
+    assert histogram["buckets"] == [[0.01, 1], [0.1, 3], [1.0, 3]]
+
+
+def test_timer_records_duration(metrics):
+    with metrics.timer("stage_seconds", {"stage": "load"}):
+        pass
+    histogram = find(metrics.snapshot()["histograms"], "stage_seconds", stage="load")
+    assert histogram["count"] == 1
+    assert histogram["sum"] >= 0
+
+
+def test_json_summary_sink_writes_file(metrics, tmp_path):
+    path = tmp_path / "out" / "metrics.json"
+    metrics.add_sink(JsonSummarySink(str(path)))
+    metrics.inc("batches_total")
+
+    metrics.flush()
+
+    assert find(json.loads(path.read_text())["counters"], "batches_total")["value"] == 1
+
+
+def test_prometheus_sink_format(metrics, tmp_path):
+    path = tmp_path / "metrics.prom"
+    metrics.add_sink(PrometheusTextFileSink(str(path)))
+    metrics.inc("http_requests_total", labels={"method": "GET", "status": 200})
+    metrics.observe("batch_post_seconds", 0.2, buckets=(0.1, 1.0))
+
+    metrics.flush()
+
+    lines = path.read_text().splitlines()
+    assert "# TYPE animal_etl_http_requests_total counter" in lines
+    assert 'animal_etl_http_requests_total{method="GET",status="200"} 1' in lines
+    assert 'animal_etl_batch_post_seconds_bucket{le="0.1"} 0' in lines
+    assert 'animal_etl_batch_post_seconds_bucket{le="+Inf"} 1' in lines
+    assert "animal_etl_batch_post_seconds_count 1" in lines
+
+
+def test_manager_flushes_metrics_even_on_failure():
+    snapshots = []
+    metrics = Metrics.get_metrics()
+    metrics.add_sink(CallbackSink(snapshots.append))
+    extractor = MagicMock()
+    extractor.get_all_animals.side_effect = Exception("Boom")
+    try:
+        with pytest.raises(Exception, match="Boom"):
+            AnimalETLManager(extractor, MagicMock(), MagicMock()).run()
+    finally:
+        metrics.sinks.remove(metrics.sinks[-1])
+
+    assert len(snapshots) == 1
+    assert find(snapshots[0]["histograms"], "run_seconds", mode="batch")["count"] >= 1
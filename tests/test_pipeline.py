@@ -0,0 +1,134 @@
+import threading
+import time
+import pytest
+from itertools import islice
+from unittest.mock import MagicMock, patch
+
+from etl.load import AnimalLoader
+from etl.pipeline import PipelineExecutor
+from tests.helpers import make_mock_config
+
+
+@pytest.fixture
+def mock_config():
+    return make_mock_config(queue_size=2, transform_workers=2, load_workers=2)
+
+
+@pytest.fixture
+def pipeline(mock_config):
+    with patch("etl.pipeline.Logger.get_logger", return_value=MagicMock()):
+        return PipelineExecutor(mock_config)
+
+
+def make_extractor(count):
+    extractor = MagicMock()
+
+    def iter_animals():
+        for i in range(count):
+            yield {"id": i}
+
+    extractor.iter_animals.side_effect = iter_animals
+    return extractor
+
+
+def make_transformer():
+    transformer = MagicMock()
+    transformer.transform.side_effect = lambda a: {**a, "transformed": True}
+    return transformer
+
+
+def make_loader(batch_size):
+    loader = MagicMock()
+    loader.batches = []
+    lock = threading.Lock()
+
+    def iter_batches(animals):
+        it = iter(animals)
+        while batch := list(islice(it, batch_size)):
+            yield batch
+
+    def post(batch):
+        with lock:
+            loader.batches.append(list(batch))
+
+    loader.iter_batches.side_effect = iter_batches
+    loader.post_batch.side_effect = post
+    return loader
+
+
+def test_run_loads_every_record_once(pipeline):
+    loader = make_loader(batch_size=3)
+
+    pipeline.run(make_extractor(20), make_transformer(), loader)
+
+    posted = [a for batch in loader.batches for a in batch]
+    assert sorted(a["id"] for a in posted) == list(range(20))
+    assert all(a["transformed"] for a in posted)
+    assert all(len(batch) <= 3 for batch in loader.batches)
+
+
+def test_run_single_workers_preserves_order(pipeline):
+    pipeline.transform_workers = 1
+    pipeline.load_workers = 1
+    loader = make_loader(batch_size=4)
+
+    pipeline.run(make_extractor(10), make_transformer(), loader)
+
+    assert [[a["id"] for a in b] for b in loader.batches] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_run_overlaps_extract_and_load(pipeline):
+    loader = make_loader(batch_size=1)
+    extracted = []
+
+    def slow_iter_animals():
+        for i in range(3):
+            extracted.append(i)
+            yield {"id": i}
+            time.sleep(0.05)
+
+    extractor = MagicMock()
+    extractor.iter_animals.side_effect = slow_iter_animals
+    first_post_seen = []
+    loader.post_batch.side_effect = lambda batch: first_post_seen.append(len(extracted))
+
+    pipeline.run(extractor, make_transformer(), loader)
+
+    # the first record is posted while extraction is still running
+    assert first_post_seen[0] < 3
+
+
+def test_run_propagates_stage_failure(pipeline):
+    loader = make_loader(batch_size=1)
+    loader.post_batch.side_effect = Exception("Boom")
+
+    with pytest.raises(Exception, match="Boom"):
+        pipeline.run(make_extractor(50), make_transformer(), loader)
+
+
+def test_run_uses_loader_adaptive_batches(pipeline, mock_config):
+    pipeline.transform_workers = 1
+    pipeline.load_workers = 1
+    mock_config.get_adaptive_batching.return_value = True
+    mock_config.get_batch_size.return_value = 50
+    mock_config.get_max_batch_size.return_value = 100
+    mock_config.get_max_batch_bytes.return_value = 500
+
+    def post_sizes(post):
+        retry_handler = MagicMock()
+        with patch("etl.load.RetryHandler", return_value=retry_handler), \
+             patch("etl.load.Logger.get_logger", return_value=MagicMock()):
+            loader = AnimalLoader(mock_config)
+        post(loader)
+        return [len(call.kwargs["json"]) for call in retry_handler.request_with_retry.call_args_list]
+
+    transformer = MagicMock()
+    transformer.transform.side_effect = lambda a: a
+    animals = [{"id": i, "name": "x" * 50} for i in range(100)]
+    extractor = MagicMock()
+    extractor.iter_animals.side_effect = lambda: (a for a in animals)
+    pipelined = post_sizes(lambda loader: pipeline.run(extractor, transformer, loader))
+    batched = post_sizes(lambda loader: loader.post_all_animals(animals))
+
+    assert pipelined == batched
+    assert max(pipelined) < 50  # capped by max_batch_bytes
@@ -0,0 +1,54 @@
+import json
+import pickle
+
+import pytest
+
+from etl.incremental import HashIndex
+from etl.records import AnimalRecord, materialize, to_json
+from etl.transform import AnimalTransformer
+
+
+def make_record():
+    return AnimalRecord.from_dict({"id": 1, "name": "Lion", "friends": "Tiger, Bear", "born_at": None, "color": "gold"})
+
+
+def test_record_behaves_like_dict():
+    record = make_record()
+
+    assert record["id"] == 1
+    assert record["color"] == "gold"
+    assert record.get("missing", "x") == "x"
+    assert "name" in record and "missing" not in record
+    with pytest.raises(KeyError):
+        record["missing"]
+
+
+def test_record_without_field_omits_it():
+    record = AnimalRecord.from_dict({"id": 1})
+
+    assert record.to_dict() == {"id": 1}
+    assert record.get("born_at") is None
+
+
+def test_transformed_friends_are_interned_tuple():
+    first, second = make_record(), make_record()
+    AnimalTransformer().transform_batch([first, second])
+
+    assert first.friends == ("Tiger", "Bear")
+    assert first.friends[0] is second.friends[0]
+    assert first.to_dict()["friends"] == ["Tiger", "Bear"]
+
+
+def test_record_serialises_like_dict():
+    record = make_record()
+    plain = record.to_dict()
+
+    assert json.dumps([record], default=to_json) == json.dumps([plain])
+    assert materialize([record, {"id": 2}]) == [plain, {"id": 2}]
+    assert HashIndex.content_hash(record) == HashIndex.content_hash(plain)
+    assert record == plain
+
+
+def test_record_pickles():
+    record = make_record()
+    assert pickle.loads(pickle.dumps(record)) == record
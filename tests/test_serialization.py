@@ -0,0 +1,89 @@
+import gzip
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from etl.records import AnimalRecord
+from etl.serialization import Serializer
+from etl.load import AnimalLoader
+from tests.helpers import make_mock_config
+
+
+def make_config(backend="json", compression="none", min_bytes=100):
+    cfg = make_mock_config()
+    cfg.get_json_backend.return_value = backend
+    cfg.get_request_compression.return_value = compression
+    cfg.get_compression_min_bytes.return_value = min_bytes
+    return cfg
+
+
+def test_stdlib_uncompressed_lets_requests_encode():
+    serializer = Serializer(make_config())
+    batch = [{"id": 1}]
+    assert serializer.request_kwargs(batch) == {"json": batch}
+
+
+def test_roundtrip_dumps_loads():
+    serializer = Serializer(make_config())
+    data = {"id": 1, "friends": ["Tom", "Jerry"], "born_at": None}
+    assert serializer.loads(serializer.dumps(data)) == data
+
+
+def test_gzip_compresses_large_bodies():
+    serializer = Serializer(make_config(compression="gzip", min_bytes=100))
+    batch = [{"id": i, "name": "Lion"} for i in range(50)]
+
+    kwargs = serializer.request_kwargs(batch)
+
+    assert kwargs["headers"] == {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    assert json.loads(gzip.decompress(kwargs["data"])) == batch
+
+
+def test_small_bodies_are_not_compressed():
+    serializer = Serializer(make_config(compression="gzip", min_bytes=10_000))
+
+    kwargs = serializer.request_kwargs([{"id": 1}])
+
+    assert "Content-Encoding" not in kwargs["headers"]
+    assert json.loads(kwargs["data"]) == [{"id": 1}]
+
+
+@patch("etl.serialization.orjson", None)
+@patch("etl.serialization.msgspec", None)
+def test_auto_falls_back_to_stdlib():
+    assert Serializer(make_config(backend="auto")).backend == "json"
+
+
+@patch("etl.serialization.orjson", None)
+def test_missing_optional_backend_raises():
+    with pytest.raises(ImportError, match="orjson"):
+        Serializer(make_config(backend="orjson"))
+
+
+def test_unknown_settings_raise():
+    with pytest.raises(ValueError):
+        Serializer(make_config(backend="yaml"))
+    with pytest.raises(ValueError):
+        Serializer(make_config(compression="brotli"))
+
+
+def test_loader_posts_compressed_body():
+    cfg = make_config(compression="gzip", min_bytes=0)
+    retry_handler = MagicMock()
+    with patch("etl.load.RetryHandler", return_value=retry_handler), \
+         patch("etl.load.Logger.get_logger", return_value=MagicMock()):
+        loader = AnimalLoader(cfg)
+
+    loader.post_animals_batch([{"id": 1}])
+
+    kwargs = retry_handler.request_with_retry.call_args.kwargs
+    assert kwargs["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(kwargs["data"])) == [{"id": 1}]
+
+
+def test_request_kwargs_materialises_records():
+    batch = [AnimalRecord.from_dict({"id": 1, "friends": ["A"]})]
+
+    assert Serializer(make_config()).request_kwargs(batch) == {"json": [{"id": 1, "friends": ["A"]}]}
+    kwargs = Serializer(make_config(compression="gzip", min_bytes=0)).request_kwargs(batch)
+    assert json.loads(gzip.decompress(kwargs["data"])) == [{"id": 1, "friends": ["A"]}]
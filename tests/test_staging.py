@@ -0,0 +1,94 @@
+import os
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from etl.pipeline import PipelineExecutor
+from etl.records import AnimalRecord
+from etl.staging import FileExtractor, FileLoader, PassthroughTransformer
+from tests.helpers import make_mock_config
+
+
+def make_config(directory, fmt="ndjson", compression="gzip", chunk_records=2):
+    cfg = make_mock_config(staging_dir=str(directory), staging_chunk_records=chunk_records)
+    cfg.get_staging_format.return_value = fmt
+    cfg.get_staging_compression.return_value = compression
+    return cfg
+
+
+ANIMALS = [
+    {"id": i, "name": f"Animal{i}", "friends": ["A", "B"], "born_at": "2020-01-01T00:00:00+00:00"}
+    for i in range(1, 6)
+]
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_round_trip_ndjson(tmp_path, compression):
+    cfg = make_config(tmp_path, compression=compression)
+
+    results = FileLoader(cfg).post_all_animals(iter(ANIMALS))
+
+    assert [r.size for r in results] == [2, 2, 1]
+    assert len(os.listdir(tmp_path)) == 3
+    assert FileExtractor(cfg).get_all_animals() == ANIMALS
+
+
+def test_round_trip_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    cfg = make_config(tmp_path, fmt="parquet", compression="zstd")
+
+    FileLoader(cfg).post_all_animals(ANIMALS)
+
+    assert FileExtractor(cfg).get_all_animals() == ANIMALS
+
+
+def test_new_run_replaces_previous_parts(tmp_path):
+    cfg = make_config(tmp_path)
+    FileLoader(cfg).post_all_animals(ANIMALS)
+
+    FileLoader(cfg).post_all_animals(ANIMALS[:1])
+
+    assert FileExtractor(cfg).get_all_animals() == ANIMALS[:1]
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_empty_run_removes_previous_parts(tmp_path, pipelined):
+    cfg = make_config(tmp_path)
+    FileLoader(cfg).post_all_animals(ANIMALS)
+
+    loader = FileLoader(cfg)
+    if pipelined:
+        extractor = MagicMock()
+        extractor.iter_animals.side_effect = lambda: (a for a in [])
+        with patch("etl.pipeline.Logger.get_logger", return_value=MagicMock()):
+            PipelineExecutor(cfg).run(extractor, PassthroughTransformer(), loader)
+    else:
+        loader.post_all_animals([])
+
+    # a later replay must not pick up the previous run's records
+    with pytest.raises(FileNotFoundError):
+        FileExtractor(cfg).get_all_animals()
+
+
+def test_writes_compact_records(tmp_path):
+    cfg = make_config(tmp_path)
+
+    FileLoader(cfg).post_all_animals([AnimalRecord.from_dict(a) for a in ANIMALS])
+
+    assert FileExtractor(cfg).get_all_animals() == ANIMALS
+
+
+def test_replay_without_staged_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FileExtractor(make_config(tmp_path)).get_all_animals()
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        FileLoader(make_config(tmp_path, fmt="csv"))
+
+
+def test_passthrough_transformer():
+    transformer = PassthroughTransformer()
+    assert transformer.transform_batch(ANIMALS) is ANIMALS
+    assert list(transformer.transform_all(ANIMALS)) == ANIMALS
@@ -0,0 +1,366 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from requests.exceptions import RequestException
+
+import asyncio
+from etl.utils import (
+    RetryHandler, HttpSession, RateLimiter, TokenBucket, RetryBudget, CircuitBreaker,
+    CircuitOpenError, RetryBudgetExhaustedError, ClientStatusError, PayloadTooLargeError, parse_retry_after, _LazyFileHandler,
+)
+from tests.helpers import make_mock_config
+
+
+@pytest.fixture
+def mock_config():
+    return make_mock_config(
+        home_url="http://fakeapi.com/home", max_attempts=3, pool_maxsize=4, rate_limit_burst=2,
+        retry_jitter=False, circuit_failure_threshold=10,
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_session():
+    HttpSession.close()
+    RateLimiter.reset()
+    RetryBudget.reset()
+    CircuitBreaker.reset()
+    yield
+    HttpSession.close()
+    RateLimiter.reset()
+    RetryBudget.reset()
+    CircuitBreaker.reset()
+
+
+def make_response(status_code, headers=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.headers = headers or {}
+    return resp
+
+
+def test_session_is_shared_between_handlers(mock_config):
+    first = RetryHandler(mock_config)
+    second = RetryHandler(mock_config)
+    assert first.session is second.session
+
+
+def test_session_mounts_pooled_adapter(mock_config):
+    session = HttpSession.get_session(mock_config)
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 4
+
+
+@patch("etl.utils.time.sleep")
+def test_request_with_retry_uses_session(mock_sleep, mock_config):
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.return_value = make_response(200)
+
+    resp = handler.request_with_retry("GET", "http://fakeapi.com", timeout=5)
+
+    assert resp.status_code == 200
+    handler.session.request.assert_called_once_with("GET", "http://fakeapi.com", timeout=5)
+    mock_sleep.assert_not_called()
+
+
+@patch("etl.utils.time.sleep")
+def test_request_with_retry_retries_server_errors(mock_sleep, mock_config):
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.side_effect = [make_response(503), RequestException("boom"), make_response(200)]
+
+    resp = handler.request_with_retry("GET", "http://fakeapi.com")
+
+    assert resp.status_code == 200
+    assert handler.session.request.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+@patch("etl.utils.time.sleep")
+def test_request_with_retry_gives_up(mock_sleep, mock_config):
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.return_value = make_response(500)
+
+    with pytest.raises(Exception, match="after 3 attempts"):
+        handler.request_with_retry("POST", "http://fakeapi.com")
+
+
+@patch("etl.utils.time.sleep")
+def test_request_with_retry_does_not_retry_payload_too_large(mock_sleep, mock_config):
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.return_value = make_response(413)
+
+    with pytest.raises(PayloadTooLargeError):
+        handler.request_with_retry("POST", "http://fakeapi.com")
+    assert handler.session.request.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+
+
+@patch("etl.utils.time.sleep")
+def test_request_with_retry_honours_retry_after(mock_sleep, mock_config):
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.side_effect = [make_response(429, {"Retry-After": "7"}), make_response(200)]
+    bucket = handler.rate_limiter.for_url("http://fakeapi.com")
+    bucket.pause = MagicMock()
+
+    handler.request_with_retry("GET", "http://fakeapi.com")
+
+    mock_sleep.assert_called_once_with(7.0)
+    bucket.pause.assert_called_once_with(7.0)
+
+
+def test_rate_limiter_matches_longest_prefix(mock_config):
+    mock_config.get_animals_rate_limit.return_value = 5
+    limiter = RateLimiter.get_limiter(mock_config)
+
+    assert limiter.for_url("http://fakeapi.com/animals/12") is limiter.buckets["http://fakeapi.com/animals"]
+    assert limiter.for_url("http://fakeapi.com/home").rate == 0  # home is unlimited
+    assert limiter.for_url("http://other.com/x") is limiter.for_url("http://other.com/y")
+    assert RateLimiter.get_limiter(mock_config) is limiter
+
+
+@patch("etl.utils.time.sleep")
+def test_request_with_retry_pauses_shared_bucket(mock_sleep, mock_config):
+    mock_config.get_animals_rate_limit.return_value = 100
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.side_effect = [make_response(503, {"Retry-After": "30"}), make_response(200)]
+    bucket = handler.rate_limiter.for_url("http://fakeapi.com/animals")
+    bucket.pause = MagicMock()
+
+    handler.request_with_retry("GET", "http://fakeapi.com/animals/1")
+
+    bucket.pause.assert_called_once_with(30.0)
+
+
+@patch("etl.utils.time.sleep")
+def test_retry_after_pauses_endpoint_without_rate_limit_and_is_capped(mock_sleep, mock_config):
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.side_effect = [make_response(503, {"Retry-After": "600"}), make_response(200)]
+    bucket = handler.rate_limiter.for_url("http://fakeapi.com/home")
+    bucket.pause = MagicMock()
+
+    handler.request_with_retry("POST", "http://fakeapi.com/home")
+
+    bucket.pause.assert_called_once_with(30)  # max_backoff_seconds
+    mock_sleep.assert_called_once_with(30)
+
+
+def test_unlimited_bucket_only_enforces_pauses():
+    bucket = TokenBucket(rate=0, burst=1)
+    start = time.monotonic()
+    for _ in range(100):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+    bucket.pause(0.05)
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.05
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        bucket.acquire()
+    # two burst tokens, then five more at 50/s
+    assert time.monotonic() - start >= 0.09
+
+
+def test_token_bucket_pause_blocks_acquire():
+    bucket = TokenBucket(rate=1000, burst=5)
+    bucket.pause(0.05)
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+def test_backoff_is_capped_and_jittered(mock_config):
+    handler = RetryHandler(mock_config)
+    handler.max_backoff = 10
+    assert handler.backoff_time(1) == 2
+    assert handler.backoff_time(5) == 10
+
+    handler.jitter = True
+    waits = [handler.backoff_time(5) for _ in range(50)]
+    assert all(0 <= w <= 10 for w in waits)
+    assert len(set(waits)) > 1
+
+
+@patch("etl.utils.time.sleep")
+def test_no_sleep_after_last_attempt(mock_sleep, mock_config):
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.return_value = make_response(500)
+
+    with pytest.raises(Exception, match="after 3 attempts"):
+        handler.request_with_retry("GET", "http://fakeapi.com")
+    assert mock_sleep.call_count == 2
+
+
+@patch("etl.utils.time.sleep")
+def test_retry_budget_stops_retries(mock_sleep, mock_config):
+    mock_config.get_retry_budget_ratio.return_value = 0
+    mock_config.get_retry_budget_min.return_value = 1
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.return_value = make_response(503)
+
+    with pytest.raises(RetryBudgetExhaustedError, match="Retry budget exhausted"):
+        handler.request_with_retry("GET", "http://fakeapi.com")
+    assert handler.session.request.call_count == 2  # one retry allowed
+
+
+@patch("etl.utils.time.sleep")
+def test_circuit_opens_and_fails_fast(mock_sleep, mock_config):
+    mock_config.get_circuit_failure_threshold.return_value = 2
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.return_value = make_response(503)
+
+    # each request fails all 3 attempts but counts as one failure
+    for animal_id in (1, 2):
+        with pytest.raises(Exception, match="after 3 attempts"):
+            handler.request_with_retry("GET", f"http://fakeapi.com/animals/{animal_id}")
+    with pytest.raises(CircuitOpenError):
+        handler.request_with_retry("GET", "http://fakeapi.com/animals/3")
+    assert handler.session.request.call_count == 6
+
+    # other endpoints keep their own circuit
+    handler.session.request.return_value = make_response(200)
+    handler.request_with_retry("POST", "http://fakeapi.com/home")
+
+
+@patch("etl.utils.time.sleep")
+def test_client_errors_are_not_retried_or_counted(mock_sleep, mock_config):
+    mock_config.get_circuit_failure_threshold.return_value = 1
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    handler.session.request.return_value = make_response(404)
+
+    for _ in range(3):
+        with pytest.raises(ClientStatusError, match="404"):
+            handler.request_with_retry("GET", "http://fakeapi.com/animals/11")
+    assert handler.session.request.call_count == 3
+    assert not CircuitBreaker.get_breaker(mock_config, "http://fakeapi.com/animals/11").is_open
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.parametrize("status, error", [(413, PayloadTooLargeError), (500, Exception)])
+@patch("etl.utils.time.sleep")
+def test_half_open_trial_is_always_resolved(mock_sleep, mock_config, status, error):
+    mock_config.get_circuit_failure_threshold.return_value = 1
+    mock_config.get_circuit_reset_seconds.return_value = 0
+    mock_config.get_max_attempts.return_value = 1
+    handler = RetryHandler(mock_config)
+    handler.session = MagicMock()
+    breaker = CircuitBreaker.get_breaker(mock_config, "http://fakeapi.com/home")
+    breaker.record_failure()
+
+    handler.session.request.return_value = make_response(status)
+    with pytest.raises(error):
+        handler.request_with_retry("POST", "http://fakeapi.com/home")  # the trial
+    assert breaker.is_open == (status == 500)
+
+    handler.session.request.return_value = make_response(200)
+    assert handler.request_with_retry("POST", "http://fakeapi.com/home").status_code == 200
+
+
+def test_circuit_half_open_trial():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()       # trial request
+    assert not breaker.allow()   # only one trial at a time
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+
+
+def test_request_with_retry_async_uses_non_blocking_sleep(mock_config):
+    handler = RetryHandler(mock_config)
+    client = MagicMock()
+    responses = [make_response(503), make_response(200)]
+
+    async def request(method, url, **kwargs):
+        return responses.pop(0)
+
+    client.request = request
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    with patch("etl.utils.HttpSession.get_async_client", return_value=client), \
+         patch("asyncio.sleep", fake_sleep), \
+         patch("etl.utils.time.sleep", side_effect=AssertionError("blocking sleep")):
+        resp = asyncio.run(handler.request_with_retry_async("GET", "http://fakeapi.com"))
+
+    assert resp.status_code == 200
+    assert sleeps == [2]
+
+
+def test_logger_writes_through_background_queue():
+    from logging.handlers import QueueHandler
+    from etl.utils import Logger
+
+    logger = Logger.get_logger()
+
+    assert any(isinstance(h, QueueHandler) for h in logger.handlers)
+    assert Logger._listener is not None
+
+
+def test_logger_configure_sets_levels():
+    import logging
+    from etl.utils import Logger
+
+    cfg = MagicMock()
+    cfg.get_log_level.return_value = "warning"
+    cfg.get_console_log_level.return_value = "ERROR"
+    cfg.get_log_progress_every.return_value = 50
+    logger = Logger.get_logger()
+    try:
+        Logger.configure(cfg)
+        assert Logger._file_handler.level == logging.WARNING
+        assert Logger._console_handler.level == logging.ERROR
+        assert not logger.isEnabledFor(logging.INFO)
+        assert Logger.progress_every == 50
+    finally:
+        cfg.get_log_level.return_value = "INFO"
+        cfg.get_console_log_level.return_value = "INFO"
+        cfg.get_log_progress_every.return_value = 1000
+        Logger.configure(cfg)
+
+
+def test_logger_rejects_unknown_level():
+    from etl.utils import Logger
+
+    cfg = MagicMock()
+    cfg.get_log_level.return_value = "LOUD"
+    with pytest.raises(ValueError, match="Unknown log level"):
+        Logger.configure(cfg)
+
+
+def test_lazy_file_handler_creates_file_on_first_record(tmp_path):
+    import logging
+    path = tmp_path / "logs" / "etl.log"
+    handler = _LazyFileHandler(str(path))
+    assert not path.exists()
+
+    handler.emit(logging.LogRecord("ETLLogger", logging.INFO, __file__, 1, "hello", None, None))
+    handler.close()
+
+    assert path.read_text().strip() == "hello"